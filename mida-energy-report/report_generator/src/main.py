@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # off-screen rendering, also inherited by report worker processes
 import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 import matplotlib.dates as mdates
 from pathlib import Path
@@ -9,28 +10,645 @@ import glob
 import os
 import warnings
 import json
+import copy
+import io
 from typing import Dict, List
 import shutil
+import hashlib
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from PIL import Image as PILImage
+try:
+    import orjson
+except ImportError:  # stdlib json fallback in _write_json
+    orjson = None
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak, KeepTogether
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab import rl_config
+
+if not os.environ.get("REPORT_DEBUG"):
+    # Binary (not ASCII85) zlib streams: no extra encode pass over the embedded chart bitmaps
+    rl_config.useA85 = 0
+    rl_config.shapeChecking = 0
 
 warnings.filterwarnings('ignore')
 
-# Chart style configuration
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+# Bump when _prepare_dataframe/load_all_data change the combined frame (invalidates .cache/*.parquet)
+_DATA_CACHE_VERSION = 4
+_DATA_CACHE_PREFIX = 'all_data-'
+_TIME_CORRECTION_DAYS = 30
+
+# Shared table styles: common commands live in the base style, each table
+# only adds its header color and alignment (TableStyle parent chaining)
+_BASE_TABLE_STYLE = TableStyle([
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('LINEBELOW', (0, 0), (-1, 0), 0.75, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+_VOLTAGE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e67e22')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12)
+], parent=_BASE_TABLE_STYLE)
+
+_ACTION_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+], parent=_BASE_TABLE_STYLE)
+
+_TECH_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7f8c8d')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT')
+], parent=_BASE_TABLE_STYLE)
+
+# Daily and general report tables, built once at import
+_DAILY_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+_HOURLY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+_METRICS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+_DAILY_STATS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f0f8ff')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+])
+
+_DAILY_BREAKDOWN_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+_GENERAL_BANDS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8e44ad')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f4ecf7')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+_WEEKEND_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16a085')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#d5f4e6')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+])
+
+_GENERAL_ENV_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#d5f4e6')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+# Device report tables: the detail tables share everything but the header color
+_DEVICE_INDEX_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('LEFTPADDING', (1, 0), (1, -1), 10)
+])
+
+_DEVICE_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
+])
+
+_DEVICE_DETAIL_TABLE_STYLE = TableStyle([
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
+])
+
+_BANDS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8e44ad'))
+], parent=_DEVICE_DETAIL_TABLE_STYLE)
+
+_ENV_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60'))
+], parent=_DEVICE_DETAIL_TABLE_STYLE)
+
+_QUALITY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e67e22'))
+], parent=_DEVICE_DETAIL_TABLE_STYLE)
+
+_PLAN_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+], parent=_DEVICE_DETAIL_TABLE_STYLE)
+
+
+# Static text of the recommendations and appendix sections
+_TREND_ITEMS = (
+    "• <b>Monitoraggio continuo</b>: Implementare sistema di monitoraggio in tempo reale",
+    "• <b>Identificazione pattern</b>: Analizzare ricorrenze settimanali e mensili",
+    "• <b>Ottimizzazione oraria</b>: Spostare carichi non critici nelle ore di minor costo",
+    "• <b>Gestione picchi</b>: Implementare strategie di load shedding",
+    "• <b>Manutenzione preventiva</b>: Monitorare efficienza degli impianti",
+)
+
+# Small fixed table: append it directly, KeepTogether would only add a second wrap pass
+_ACTION_PLAN_ROWS = (
+    ("Fase", "Attività", "Timeline", "Responsabile"),
+    ("1", "Analisi approfondita carichi", "2 settimane", "Team Energia"),
+    ("2", "Identificazione ottimizzazioni", "1 settimana", "Team Energia"),
+    ("3", "Pianificazione interventi", "1 mese", "Management"),
+    ("4", "Implementazione", "2-3 mesi", "Team Tecnico"),
+    ("5", "Monitoraggio risultati", "Continuo", "Team Energia"),
+)
+
+_ACTION_PLAN_COL_WIDTHS = (1.5*cm, 6*cm, 3*cm, 3*cm)
+
+# Righe fisse dell'appendice tecnica; solo il periodo analizzato cambia per report
+_TECH_INFO_ROWS = (
+    ("Parametro", "Valore", "Descrizione"),
+    ("Dispositivo", "Shelly EM", "Monitor energia trifase"),
+    ("Campionamento", "60 secondi", "Intervallo tra misurazioni"),
+    ("Metriche", "15+ parametri", "Tensione, corrente, potenza, energia"),
+    ("Risoluzione", "0.1W / 0.001kWh", "Precisione misurazioni"),
+    ("Formato dati", "CSV timestamp", "Compatibile con tutti i software"),
+)
+
+_GENERAL_TOC_ITEMS = (
+    "• 1. SINTESI GENERALE E METRICHE PRINCIPALI",
+    "• 2. ANALISI DETTAGLIATA PER GIORNO",
+    "• 3. GRAFICI DI SINTESI",
+    "• 4. RACCOMANDAZIONI E PIANO DI AZIONE",
+    "• 5. APPENDICE TECNICA",
+)
+
+_GENERAL_SAVINGS_TEXT = """
+        <b>• Riduzione picchi del 20%</b>: Risparmio sui costi di potenza contrattuale<br/>
+        <b>• Ottimizzazione oraria</b>: -10/15% su costo energia tramite tariffe biorarie<br/>
+        <b>• Miglioramento efficienza</b>: -5/10% su consumi base<br/>
+        <b>• ROI stimato</b>: 12-18 mesi per interventi di media entità<br/>
+        <b>• Risparmio annuo stimato</b>: 15-25% sulla bolletta energetica
+        """
+
+_GENERAL_DISCLAIMER_TEXT = """
+        <b>Disclaimer:</b> Questo report è stato generato automaticamente sulla base dei dati forniti.
+        I valori sono indicativi e devono essere verificati da personale tecnico qualificato.
+        
+        <b>Note:</b> I dati sono stati corretti automaticamente per eventuali discrepanze temporali del dispositivo.
+        Le raccomandazioni sono basate su analisi statistica e best practice del settore.
+        
+        <b>Contatti:</b> Per ulteriori informazioni o analisi personalizzate, contattare il team di analisi energetica.
+        """
+
+_SAVINGS_ITEMS = (
+    "• <b>Riduzione picchi del 20%</b>: Risparmio sui costi di potenza contrattuale",
+    "• <b>Ottimizzazione oraria</b>: -10/15% su costo energia tramite tariffe biorarie",
+    "• <b>Miglioramento efficienza</b>: -5/10% su consumi base",
+    "• <b>ROI stimato</b>: 12-18 mesi per interventi di media entità",
+    "• <b>Risparmio annuo stimato</b>: 15-25% sulla bolletta energetica",
+)
+
+_METHODOLOGY_ITEMS = (
+    "• Dati raccolti tramite Home Assistant History API",
+    "• Periodo di analisi: ultimi 7 giorni",
+    "• Frequenza campionamento: dati aggregati ogni ora",
+    "• Calcolo CO2: 0.233 kg per kWh (mix energetico nazionale)",
+)
+
+_PARAMS_ITEMS = (
+    "• Tensione nominale: 220-240V",
+    "• Fascia notturna: 00:00-06:00",
+    "• Soglia consumo notturno anomalo: >30% del diurno",
+)
+
+_NOTES_ITEMS = (
+    "• I dati si riferiscono al dispositivo specifico",
+    "• Le previsioni sono basate su medie storiche a 7 giorni",
+    "• I risparmi stimati sono indicativi e dipendono dalle condizioni operative",
+)
+
+# Columns read by the per-device analyses, plots and PDF
+_DEVICE_COLUMNS = ('datetime', 'date', 'hour', 'weekday', 'total_act_energy',
+                   'max_act_power', 'avg_voltage', 'power_factor_est')
+
+# Aggregates shown in each device's summary and _stats.json
+_DEVICE_STAT_COLUMNS = ('total_act_energy', 'max_act_power')
+_DEVICE_STAT_FUNCS = ['sum', 'mean', 'max', 'min']
+
+_NAT_NS = np.iinfo(np.int64).min
+
+
+@lru_cache(maxsize=128)
+def _hex(color: str) -> colors.Color:
+    """Parsed HexColor, shared across reports (Color objects are never mutated by styles)."""
+    return colors.HexColor(color)
+
+
+def _epoch_seconds_to_ns(seconds: np.ndarray) -> np.ndarray:
+    """Unix seconds to int64 nanoseconds (NaN -> NaT) without parsing through pd.to_datetime."""
+    values = np.asarray(seconds)
+    if values.dtype.kind in 'iu':
+        return values.astype('int64') * 1_000_000_000
+    values = values.astype('float64')
+    missing = np.isnan(values)
+    ns = np.round(np.where(missing, 0, values) * 1e9).astype('int64')
+    ns[missing] = _NAT_NS
+    return ns
+
+
+@lru_cache(maxsize=1)
+def _apply_chart_style():
+    """Chart style configuration, applied once per process before the first figure."""
+    # seaborn serve solo per la palette: importato qui, non a ogni avvio del modulo
+    import seaborn as sns
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+
+
+def _reuse_figure(figsize: tuple):
+    """Activate this process's figure of the given size (created on first use), cleared, with one Axes."""
+    _apply_chart_style()
+    # constrained layout is solved at draw time: no tight_layout() or bbox_inches='tight' render passes
+    fig = plt.figure(num=f"report_{figsize[0]}x{figsize[1]}", figsize=figsize, layout='constrained')
+    fig.clear()
+    return fig, fig.add_subplot(111)
+
+
+def _save_figure(fig, path: Path):
+    """Save a chart PNG at zlib level 3: faster encode than the default 6 for ~20% larger files."""
+    fig.savefig(path, dpi=150, pil_kwargs={'compress_level': 3})
+
+
+# Risoluzione dei grafici dentro il PDF (i PNG su disco restano a 150 dpi pieni)
+_PDF_IMAGE_DPI = 150
+
+
+def _pdf_image(plot_path: Path, width: float, height: float) -> Image:
+    """Chart flowable from a JPEG downscaled to the embed size (DCT passthrough, no Flate re-encode)."""
+    max_px = (round(width / inch * _PDF_IMAGE_DPI), round(height / inch * _PDF_IMAGE_DPI))
+    buffer = io.BytesIO()
+    with PILImage.open(plot_path) as im:
+        im = im.convert('RGB')
+        im.thumbnail(max_px, PILImage.Resampling.LANCZOS)
+        im.save(buffer, 'JPEG', quality=85, optimize=True)
+    buffer.seek(0)
+    return Image(buffer, width=width, height=height)
+
+
+@lru_cache(maxsize=64)
+def _row_heights(style: TableStyle, n_rows: int, n_cols: int) -> tuple:
+    """Row heights ReportLab computes for single-line text cells in this style, measured once per shape.
+
+    Valid only for tables whose cells are all single-line text: the key is style and shape, not content.
+    _text_table checks this before using the cached heights. The heights are read from the probe's
+    _rowHeights, the attribute Table.wrap fills in (wrap itself only returns the total size).
+    """
+    probe = Table([['0'] * n_cols] * n_rows, style=style)
+    probe.wrap(0, 0)
+    return tuple(probe._rowHeights)
+
+
+def _text_table(rows, col_widths, style: TableStyle) -> Table:
+    """Styled Table of single-line text cells with precomputed rowHeights (skips per-cell height measuring)."""
+    rows = list(rows)
+    # Le altezze in cache valgono solo per testo su una riga: niente flowable né "\n" nelle celle
+    for row in rows:
+        for cell in row:
+            if not isinstance(cell, (str, int, float)) or '\n' in str(cell):
+                raise ValueError(f"_text_table supports single-line text cells only, got {cell!r}")
+    table = Table(rows, colWidths=col_widths, rowHeights=_row_heights(style, len(rows), len(col_widths)))
+    table.setStyle(style)
+    return table
+
+
+def _hourly_array(values: Dict) -> np.ndarray:
+    """Length-24 array from an hour -> value dict (int or str keys, missing hours = 0)."""
+    return np.fromiter((values.get(h, values.get(str(h), 0)) for h in range(24)), dtype=float, count=24)
+
+
+def _json_ready(obj):
+    """Plain-Python copy of report statistics: NumPy values unwrapped, NaN/inf as None."""
+    if isinstance(obj, dict):
+        return {(k.item() if isinstance(k, np.generic) else k): _json_ready(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [_json_ready(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
+def _write_json(path: Path, data: Dict):
+    """Write report statistics as indented UTF-8 JSON (orjson when installed, stdlib json otherwise)."""
+    # Stesso output con entrambi: testo UTF-8 non escapato, NaN come null, date e altri oggetti con str()
+    data = _json_ready(data)
+    if orjson is not None:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        path.write_bytes(orjson.dumps(data, default=str, option=options))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=str, ensure_ascii=False, allow_nan=False)
+
+
+def _whole_seconds(values: pd.Series) -> bool:
+    """True if a datetime64[ns] column has no sub-second part (NaT ignored)."""
+    if values.dtype != 'datetime64[ns]':
+        return False
+    ns = values.to_numpy().view('i8')
+    return not (ns[ns != np.iinfo(np.int64).min] % 10**9).any()
+
+
+def _csv_needs_quoting(table: pa.Table) -> bool:
+    """True if a column name or string value contains a delimiter, quote or line break."""
+    special = r'[",\r\n]'
+    if any(pc.match_substring_regex(pa.array(table.column_names), special).to_pylist()):
+        return True
+    for column in table.columns:
+        for chunk in column.chunks:
+            # Colonne category: basta controllare il dizionario
+            values = chunk.dictionary if pa.types.is_dictionary(chunk.type) else chunk
+            if (pa.types.is_string(values.type) or pa.types.is_large_string(values.type)) \
+                    and pc.any(pc.match_substring_regex(values, special)).as_py():
+                return True
+    return False
+
+
+def _write_csv(df: pd.DataFrame, path: Path):
+    """Export a DataFrame to CSV through Arrow's C++ writer (much faster than DataFrame.to_csv)."""
+    # Unica differenza da to_csv: i float interi escono senza ".0" (1208 invece di 1208.0)
+    # Timestamp al secondo solo se interi (come to_csv); quelli corretti con frazioni restano in ns
+    seconds = {
+        col: df[col].astype('datetime64[s]')
+        for col in ('datetime', 'datetime_raw')
+        if col in df.columns and _whole_seconds(df[col])
+    }
+    table = pa.Table.from_pandas(df.assign(**seconds), preserve_index=False)
+    if _csv_needs_quoting(table):
+        # Arrow quoterebbe tutte le stringhe: to_csv quota solo i valori che ne hanno bisogno
+        df.to_csv(path, index=False)
+        return
+    with open(path, 'wb') as f:
+        # Intestazione scritta a parte: Arrow quota sempre i nomi delle colonne
+        f.write((','.join(table.column_names) + '\n').encode('utf-8'))
+        pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+
+
+def _needs_time_correction(time_diff: timedelta) -> bool:
+    """True if the data is too far from the current time to trust the device clock."""
+    return abs(time_diff.days) > _TIME_CORRECTION_DAYS
+
+
+def _report_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Worker pool for report generation, started without fork."""
+    # Nell'add-on girano thread (collector, auto-update): un fork potrebbe copiare
+    # nel figlio un lock già acquisito (es. logging) e bloccare il worker
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+
+
+@lru_cache(maxsize=1)
+def _code_version() -> str:
+    """Hash of this module's source: a change to the report code or layout invalidates saved reports."""
+    return hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+
+
+def _report_is_current(report_dir: Path, pdf_name: str, signature: str) -> bool:
+    """True if report_dir already holds pdf_name built from data with this signature ('' = never)."""
+    if not signature:
+        return False
+    try:
+        return (report_dir / pdf_name).exists() and (report_dir / ".sig").read_text() == signature
+    except OSError:
+        return False
+
+
+def _hist_bars(ax, values, bins: int):
+    """Histogram pre-binned with np.histogram and drawn as one bar call (cheaper than ax.hist)."""
+    values = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+           edgecolor='black', alpha=0.7, color='steelblue')
+
+
+def _hourly_sums(hour: np.ndarray, power: np.ndarray, energy: np.ndarray):
+    """Per-hour (0-23) row count, power sum, valid power count and energy sum via bincount, NaN skipped."""
+    valid = (hour >= 0) & (hour < 24)
+    h = hour[valid].astype(np.intp)
+    power, energy = power[valid], energy[valid]
+    power_ok, energy_ok = ~np.isnan(power), ~np.isnan(energy)
+    return (
+        np.bincount(h, minlength=24),
+        np.bincount(h[power_ok], weights=power[power_ok], minlength=24),
+        np.bincount(h[power_ok], minlength=24),
+        np.bincount(h[energy_ok], weights=energy[energy_ok], minlength=24),
+    )
+
+
+def _day_run_starts(dates: pd.Series) -> np.ndarray:
+    """Start position of each run of equal dates (rows already in time order, at least one row)."""
+    keys = dates.cat.codes.to_numpy() if isinstance(dates.dtype, pd.CategoricalDtype) else dates.to_numpy()
+    return np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+
+
+def _run_sums(vals: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """NaN-skipping Kahan sums of the runs beginning at starts, in row order like pandas groupby."""
+    # Stessa somma compensata di groupby sum/mean (np.add.reduceat somma senza compensazione
+    # e sposta l'ultima cifra: 717.1 diventava 717.0 dopo l'arrotondamento). Un passo per posizione
+    # nella run, vettoriale su tutte le run
+    lengths = np.diff(np.append(starts, len(vals)))
+    sums = np.zeros(len(starts))
+    compensation = np.zeros(len(starts))
+    live = np.arange(len(starts))
+    for k in range(lengths.max(initial=0)):
+        live = live[lengths[live] > k]
+        v = vals[starts[live] + k]
+        ok = ~np.isnan(v)
+        idx, v = live[ok], v[ok]
+        y = v - compensation[idx]
+        t = sums[idx] + y
+        c = t - sums[idx] - y
+        # Come pandas: con valori infiniti la compensazione NaN viene azzerata
+        compensation[idx] = np.where(np.isnan(c), 0.0, c)
+        sums[idx] = t
+    return sums
+
+
+def _run_reduce(values: pd.Series, starts: np.ndarray, how: str) -> np.ndarray:
+    """NaN-skipping sum/max/mean over the runs beginning at starts (same results as pandas groupby)."""
+    vals = np.asarray(values, dtype=float)
+    if how == 'max':
+        # fmax ignora i NaN; un giorno tutto NaN resta NaN
+        return np.fmax.reduceat(vals, starts)
+    sums = _run_sums(vals, starts)
+    if how == 'sum':
+        return sums
+    counts = np.add.reduceat(~np.isnan(vals), starts)
+    return np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0)
+
+
+def _hourly_stats(hour: np.ndarray, power: np.ndarray) -> Dict:
+    """groupby('hour') mean/max/min of power rounded to 0.1, in the same dict layout as DataFrame.to_dict()."""
+    if hour.dtype.kind == 'f':
+        keep = ~np.isnan(hour)
+        hour, power = hour[keep], power[keep]
+    if len(hour) == 0:
+        return {'mean': {}, 'max': {}, 'min': {}}
+    if np.any(hour[1:] < hour[:-1]):
+        order = np.argsort(hour, kind='stable')
+        hour, power = hour[order], power[order]
+    # Righe in ordine di ora: una run contigua per ogni ora presente
+    starts = np.concatenate(([0], np.flatnonzero(hour[1:] != hour[:-1]) + 1))
+    hours = hour[starts].astype(int).tolist()
+    return {
+        'mean': dict(zip(hours, np.round(_run_reduce(power, starts, 'mean'), 1).tolist())),
+        'max': dict(zip(hours, np.round(_run_reduce(power, starts, 'max'), 1).tolist())),
+        'min': dict(zip(hours, np.round(-_run_reduce(-power, starts, 'max'), 1).tolist())),
+    }
+
+
+def _sorted_daily_sum(dates: pd.Series, values: pd.Series) -> pd.Series:
+    """groupby('date').sum() for rows already in time order: one np.add.reduceat over the day runs."""
+    if len(dates) == 0:
+        return pd.Series([], index=pd.Index([], name=dates.name), name=values.name, dtype=float)
+    starts = _day_run_starts(dates)
+    return pd.Series(_run_reduce(values, starts, 'sum'),
+                     index=pd.Index(dates.to_numpy()[starts], name=dates.name), name=values.name)
+
+
+def _quantile(values: np.ndarray, q: float) -> float:
+    """Linear-interpolated quantile (same as pandas) via partition instead of a full sort."""
+    if len(values) == 0:
+        return float('nan')
+    pos = q * (len(values) - 1)
+    lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+    part = np.partition(values, [lo, hi])
+    return float(part[lo] + (part[hi] - part[lo]) * (pos - lo))
+
+
+def _top_k_positions(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """Positions of the k largest/smallest values, ordered like nlargest/nsmallest (O(n), no sort)."""
+    missing = np.isnan(values)
+    valid = np.flatnonzero(~missing)
+    vals = values[valid] if largest else -values[valid]
+    n = min(k, len(vals))
+    if n == 0:
+        return np.flatnonzero(missing)[:k]
+    threshold = np.partition(vals, len(vals) - n)[len(vals) - n]
+    above = np.flatnonzero(vals > threshold)
+    ties = np.flatnonzero(vals == threshold)[:n - len(above)]
+    selected = np.concatenate([above, ties])
+    # Highest first, earliest row first among equal values; NaN rows only fill the tail
+    positions = valid[selected[np.lexsort((selected, -vals[selected]))]]
+    return np.concatenate([positions, np.flatnonzero(missing)[:k - n]])
+
 
 class PDFReportGenerator:
     """Professional PDF report generator."""
     
+    # Stylesheet shared by every generator in the process (built by the first one)
+    _shared_styles = None
+    # Parsed fixed-text Paragraphs, keyed by (text, style name)
+    _static_paragraphs = {}
+    
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._create_custom_styles()
+        if PDFReportGenerator._shared_styles is None:
+            self.styles = getSampleStyleSheet()
+            self._create_custom_styles()
+            PDFReportGenerator._shared_styles = self.styles
+        self.styles = PDFReportGenerator._shared_styles
+    
+    def static_paragraph(self, text: str, style_name: str) -> Paragraph:
+        """Paragraph for fixed text, parsed once per process and copied per use."""
+        key = (text, style_name)
+        paragraph = self._static_paragraphs.get(key)
+        if paragraph is None:
+            paragraph = self._static_paragraphs[key] = Paragraph(text, self.styles[style_name])
+        # Flowables carry layout state during a build, so every story gets its own shallow copy
+        return copy.copy(paragraph)
+    
+    def static_list(self, items: tuple, style_name: str) -> Paragraph:
+        """One <br/>-joined Paragraph for a fixed bullet list."""
+        return self.static_paragraph('<br/>'.join(items), style_name)
     
     def _create_custom_styles(self):
         """Create custom styles for the report."""
@@ -43,7 +661,7 @@ class PDFReportGenerator:
                 fontSize=24,
                 spaceAfter=30,
                 alignment=TA_CENTER,
-                textColor=colors.HexColor('#2c3e50'),
+                textColor=_hex('#2c3e50'),
                 fontName='Helvetica-Bold'
             ))
         
@@ -55,13 +673,13 @@ class PDFReportGenerator:
                 fontSize=16,
                 spaceBefore=20,
                 spaceAfter=12,
-                textColor=colors.HexColor('#2980b9'),
+                textColor=_hex('#2980b9'),
                 fontName='Helvetica-Bold',
                 borderPadding=5,
-                borderColor=colors.HexColor('#3498db'),
+                borderColor=_hex('#3498db'),
                 borderWidth=1,
                 borderRadius=2,
-                backgroundColor=colors.HexColor('#ecf0f1')
+                backgroundColor=_hex('#ecf0f1')
             ))
         
         # Subtitle
@@ -72,7 +690,7 @@ class PDFReportGenerator:
                 fontSize=12,
                 spaceBefore=10,
                 spaceAfter=8,
-                textColor=colors.HexColor('#34495e')
+                textColor=_hex('#34495e')
             ))
         
         # Highlighted text (custom - doesn't exist in default)
@@ -82,10 +700,10 @@ class PDFReportGenerator:
                 parent=self.styles['Normal'],
                 fontSize=10,
                 spaceAfter=6,
-                textColor=colors.HexColor('#e74c3c'),
-                backColor=colors.HexColor('#fdf2e9'),
+                textColor=_hex('#e74c3c'),
+                backColor=_hex('#fdf2e9'),
                 borderPadding=3,
-                borderColor=colors.HexColor('#f5b7b1'),
+                borderColor=_hex('#f5b7b1'),
                 borderWidth=1
             ))
         
@@ -117,7 +735,7 @@ class PDFReportGenerator:
                 fontSize=28,
                 spaceAfter=20,
                 alignment=TA_CENTER,
-                textColor=colors.HexColor('#2c3e50'),
+                textColor=_hex('#2c3e50'),
                 fontName='Helvetica-Bold'
             ))
         
@@ -129,7 +747,7 @@ class PDFReportGenerator:
                 fontSize=14,
                 spaceAfter=30,
                 alignment=TA_CENTER,
-                textColor=colors.HexColor('#7f8c8d')
+                textColor=_hex('#7f8c8d')
             ))
         
         # Separator line
@@ -143,6 +761,35 @@ class PDFReportGenerator:
                 textColor=colors.grey
             ))
         
+        # Bullet list rendered as a single paragraph (lines joined with <br/>)
+        if 'ListText' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='ListText',
+                parent=self.styles['Normal'],
+                leading=16
+            ))
+        
+        # Device report cover lines
+        if 'CoverInfo' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='CoverInfo',
+                parent=self.styles['Normal'],
+                fontSize=11,
+                alignment=1,
+                spaceAfter=8
+            ))
+        
+        # Device report savings estimates
+        if 'SavingsText' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='SavingsText',
+                parent=self.styles['Normal'],
+                fontSize=10,
+                textColor=_hex('#c0392b'),
+                leading=17,  # same pitch as one paragraph per line with spaceAfter=5
+                spaceAfter=5
+            ))
+        
         # Footer
         if 'FooterStyle' not in self.styles:
             self.styles.add(ParagraphStyle(
@@ -157,6 +804,7 @@ class PDFReportGenerator:
     def create_daily_pdf(self, analysis: Dict, date: datetime.date, output_path: Path, 
                          plot_paths: List[Path], day_data: pd.DataFrame):
         """Create daily report PDF."""
+        title_date = date.strftime('%d/%m/%Y')
         pdf_path = output_path / f"report_giornaliero_{date.strftime('%Y%m%d')}.pdf"
         
         # Create PDF document
@@ -173,7 +821,7 @@ class PDFReportGenerator:
         
         # Header
         story.append(Paragraph(f"REPORT GIORNALIERO CONSUMI ENERGIA", self.styles['MainTitle']))
-        story.append(Paragraph(f"Data: {date.strftime('%d/%m/%Y')}", self.styles['SubTitle']))
+        story.append(Paragraph(f"Data: {title_date}", self.styles['SubTitle']))
         story.append(Paragraph(f"Generato il: {datetime.now().strftime('%d/%m/%Y %H:%M')}", self.styles['Normal']))
         story.append(Spacer(1, 20))
         
@@ -192,18 +840,7 @@ class PDFReportGenerator:
             ["Punti dati", f"{analysis.get('data_points', 0)}", "n°"]
         ]
         
-        summary_table = Table(summary_data, colWidths=[3*cm, 3*cm, 2*cm])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-        ]))
+        summary_table = _text_table(summary_data, [3*cm, 3*cm, 2*cm], _DAILY_SUMMARY_TABLE_STYLE)
         
         story.append(summary_table)
         story.append(Spacer(1, 20))
@@ -216,7 +853,7 @@ class PDFReportGenerator:
             if plot_path.exists():
                 story.append(Paragraph(f"Grafico: {plot_path.stem}", self.styles['SubTitle']))
                 try:
-                    img = Image(str(plot_path), width=6*inch, height=4*inch)
+                    img = _pdf_image(plot_path, 6*inch, 4*inch)
                     story.append(img)
                     story.append(Spacer(1, 10))
                 except Exception as e:
@@ -226,40 +863,20 @@ class PDFReportGenerator:
         story.append(Paragraph("🕒 ANALISI ORARIA DETTAGLIATA", self.styles['SectionTitle']))
         
         if 'hourly_stats' in analysis:
-            hourly_data = [["Ora", "Potenza Media (W)", "Max (W)", "Min (W)"]]
-            
             hourly_stats = analysis['hourly_stats']
-            for hour in range(24):
-                mean_val = hourly_stats.get('mean', {}).get(str(hour), 0)
-                max_val = hourly_stats.get('max', {}).get(str(hour), 0)
-                min_val = hourly_stats.get('min', {}).get(str(hour), 0)
-                
-                hourly_data.append([
-                    f"{hour:02d}:00",
-                    f"{mean_val:.1f}",
-                    f"{max_val:.1f}",
-                    f"{min_val:.1f}"
-                ])
+            mean_vals, max_vals, min_vals = (
+                _hourly_array(hourly_stats.get(stat, {})) for stat in ('mean', 'max', 'min')
+            )
+            hourly_data = [["Ora", "Potenza Media (W)", "Max (W)", "Min (W)"]] + [
+                [f"{hour:02d}:00", f"{mean_val:.1f}", f"{max_val:.1f}", f"{min_val:.1f}"]
+                for hour, mean_val, max_val, min_val in zip(
+                    range(24), mean_vals.tolist(), max_vals.tolist(), min_vals.tolist())
+            ]
             
             # Dividi in due tabelle per evitare overflow
             half = len(hourly_data) // 2
-            table1 = Table(hourly_data[:half], colWidths=[2*cm, 3*cm, 2.5*cm, 2.5*cm])
-            table2 = Table(hourly_data[half:], colWidths=[2*cm, 3*cm, 2.5*cm, 2.5*cm])
-            
-            table_style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-            ])
-            
-            table1.setStyle(table_style)
-            table2.setStyle(table_style)
+            table1 = _text_table(hourly_data[:half], [2*cm, 3*cm, 2.5*cm, 2.5*cm], _HOURLY_TABLE_STYLE)
+            table2 = _text_table(hourly_data[half:], [2*cm, 3*cm, 2.5*cm, 2.5*cm], _HOURLY_TABLE_STYLE)
             
             story.append(table1)
             story.append(Spacer(1, 10))
@@ -284,16 +901,14 @@ class PDFReportGenerator:
             recommendations.append("• <b>Consumi ottimali</b>: nessuna criticità rilevata, mantenere il buon andamento")
         
         for rec in recommendations:
-            story.append(Paragraph(rec, self.styles['Normal']))
-            story.append(Spacer(1, 5))
+            story.extend((self.static_paragraph(rec, 'Normal'), Spacer(1, 5)))
         
         story.append(Spacer(1, 15))
         
         # Footer
-        story.append(Paragraph("_" * 80, self.styles['LineStyle']))
+        story.append(self.static_paragraph("_" * 80, 'LineStyle'))
         story.append(Spacer(1, 5))
-        story.append(Paragraph("Report generato automaticamente da Shelly Energy Analyzer", 
-                              self.styles['FooterStyle']))
+        story.append(self.static_paragraph("Report generato automaticamente da Shelly Energy Analyzer", 'FooterStyle'))
         
         # Genera PDF
         try:
@@ -307,17 +922,9 @@ class PDFReportGenerator:
     def create_general_pdf(self, analysis: Dict, output_path: Path, plot_paths: List[Path], 
                           all_data: pd.DataFrame, data_files: List[Path]):
         """Create general report PDF - ALWAYS OVERWRITES THE SAME FILE."""
-        # Fixed name for general report (overwrites each time)
+        # Fixed name for general report (overwrites each time: ReportLab opens it with 'wb', no unlink needed)
         pdf_path = output_path / "report_generale.pdf"
         
-        # If a file with this name already exists, remove it
-        if pdf_path.exists():
-            try:
-                pdf_path.unlink()
-                print(f"[INFO] Removed previous version of general report")
-            except Exception as e:
-                print(f"[WARN] Could not remove previous file: {e}")
-        
         # Create PDF document
         doc = SimpleDocTemplate(
             str(pdf_path),
@@ -332,37 +939,26 @@ class PDFReportGenerator:
         
         # Cover page
         story.append(Spacer(1, 2*inch))
-        story.append(Paragraph("REPORT GENERALE ANALISI CONSUMI", 
-                              self.styles['CoverTitle']))
+        story.append(self.static_paragraph("REPORT GENERALE ANALISI CONSUMI", 'CoverTitle'))
         story.append(Spacer(1, 10))
-        story.append(Paragraph("Storico Completo Dati Energetici", 
-                              self.styles['CoverSubtitle']))
+        story.append(self.static_paragraph("Storico Completo Dati Energetici", 'CoverSubtitle'))
         story.append(Spacer(1, 20))
         story.append(Paragraph(f"Periodo: {analysis.get('date_range', {}).get('start', 'N/A')} - "
                              f"{analysis.get('date_range', {}).get('end', 'N/A')}", self.styles['Normal']))
-        story.append(Paragraph(f"Generato il: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", self.styles['Normal']))
-        story.append(Paragraph(f"Ultimo aggiornamento: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", 
+        generated_at = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        story.append(Paragraph(f"Generato il: {generated_at}", self.styles['Normal']))
+        story.append(Paragraph(f"Ultimo aggiornamento: {generated_at}", 
                               self.styles['HighlightText']))
         story.append(Spacer(1, 40))
-        story.append(Paragraph("Shelly Energy Analyzer", 
-                              self.styles['FooterStyle']))
+        story.append(self.static_paragraph("Shelly Energy Analyzer", 'FooterStyle'))
         story.append(PageBreak())
         
         # Table of contents
-        story.append(Paragraph("📑 INDICE DEL REPORT", self.styles['SectionTitle']))
+        story.append(self.static_paragraph("📑 INDICE DEL REPORT", 'SectionTitle'))
         story.append(Spacer(1, 10))
         
-        toc = [
-            "1. SINTESI GENERALE E METRICHE PRINCIPALI",
-            "2. ANALISI DETTAGLIATA PER GIORNO",
-            "3. GRAFICI DI SINTESI",
-            "4. RACCOMANDAZIONI E PIANO DI AZIONE",
-            "5. APPENDICE TECNICA"
-        ]
-        
-        for item in toc:
-            story.append(Paragraph(f"• {item}", self.styles['Normal']))
-            story.append(Spacer(1, 5))
+        for item in _GENERAL_TOC_ITEMS:
+            story.extend((self.static_paragraph(item, 'Normal'), Spacer(1, 5)))
         
         story.append(PageBreak())
         
@@ -381,18 +977,7 @@ class PDFReportGenerator:
             ["File elaborati", f"{len(data_files)}", "File CSV processati"]
         ]
         
-        metrics_table = Table(metrics_data, colWidths=[4*cm, 3*cm, 6*cm])
-        metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-        ]))
+        metrics_table = _text_table(metrics_data, [4*cm, 3*cm, 6*cm], _METRICS_TABLE_STYLE)
         
         story.append(metrics_table)
         story.append(Spacer(1, 20))
@@ -410,17 +995,7 @@ class PDFReportGenerator:
                 ["Variazione", f"±{daily_stats.get('max', 0) - daily_stats.get('min', 0):.2f}", "Range di consumo"]
             ]
             
-            daily_table = Table(daily_data, colWidths=[4*cm, 3*cm, 6*cm])
-            daily_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f0f8ff')),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-            ]))
+            daily_table = _text_table(daily_data, [4*cm, 3*cm, 6*cm], _DAILY_STATS_TABLE_STYLE)
             
             story.append(daily_table)
         
@@ -431,14 +1006,14 @@ class PDFReportGenerator:
         
         if 'date' in all_data.columns:
             # Raggruppa dati per giorno
-            daily_summary = all_data.groupby('date').agg({
-                'total_act_energy': 'sum',
-                'max_act_power': ['max', 'mean'],
-                'avg_voltage': 'mean',
-                'avg_current': 'mean'
-            }).round(2)
-            
-            daily_summary.columns = ['energia_kwh', 'potenza_max', 'potenza_media', 'tensione_media', 'corrente_media']
+            # all_data è ordinato per datetime: ogni giorno è un blocco contiguo di righe
+            starts = _day_run_starts(all_data['date']) if len(all_data) else np.array([], dtype=np.intp)
+            daily_summary = pd.DataFrame({
+                'energia_kwh': _run_reduce(all_data['total_act_energy'], starts, 'sum'),
+                'potenza_max': _run_reduce(all_data['max_act_power'], starts, 'max'),
+                'potenza_media': _run_reduce(all_data['max_act_power'], starts, 'mean'),
+                'tensione_media': _run_reduce(all_data['avg_voltage'], starts, 'mean'),
+            }, index=all_data['date'].to_numpy()[starts]).round(2)
             daily_summary['energia_kwh'] = daily_summary['energia_kwh'] / 1000
             
             # Create daily summary table
@@ -446,13 +1021,14 @@ class PDFReportGenerator:
             
             table_data = [["Data", "Energia (kWh)", "P.Max (W)", "P.Media (W)", "Tensione (V)"]]
             
-            for date_idx, row in daily_summary.iterrows():
+            for date_idx, energia, pmax, pmed, vmed in daily_summary[
+                    ['energia_kwh', 'potenza_max', 'potenza_media', 'tensione_media']].itertuples(name=None):
                 table_data.append([
                     date_idx.strftime('%d/%m'),
-                    f"{row['energia_kwh']:.2f}",
-                    f"{row['potenza_max']:.0f}",
-                    f"{row['potenza_media']:.0f}",
-                    f"{row['tensione_media']:.1f}"
+                    f"{energia:.2f}",
+                    f"{pmax:.0f}",
+                    f"{pmed:.0f}",
+                    f"{vmed:.1f}"
                 ])
             
             # Dividi in pagine se necessario
@@ -466,17 +1042,7 @@ class PDFReportGenerator:
                 if i > 0:
                     page_data = [table_data[0]] + page_data
                 
-                daily_table = Table(page_data, colWidths=[2.5*cm, 3*cm, 2.5*cm, 2.5*cm, 2.5*cm])
-                daily_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-                ]))
+                daily_table = _text_table(page_data, [2.5*cm, 3*cm, 2.5*cm, 2.5*cm, 2.5*cm], _DAILY_BREAKDOWN_TABLE_STYLE)
                 
                 story.append(daily_table)
                 story.append(Spacer(1, 10))
@@ -491,7 +1057,7 @@ class PDFReportGenerator:
             if plot_path.exists():
                 story.append(Paragraph(plot_path.stem.replace('_', ' ').title(), self.styles['SubTitle']))
                 try:
-                    img = Image(str(plot_path), width=6*inch, height=4*inch)
+                    img = _pdf_image(plot_path, 6*inch, 4*inch)
                     story.append(img)
                     story.append(Spacer(1, 10))
                 except Exception as e:
@@ -529,18 +1095,7 @@ class PDFReportGenerator:
                      f"{patterns['time_bands']['evening']['avg_power']:.0f}"]
                 ]
                 
-                bands_table = Table(bands_data, colWidths=[4*cm, 3*cm, 3*cm, 3.5*cm])
-                bands_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8e44ad')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f4ecf7')),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-                ]))
+                bands_table = _text_table(bands_data, [4*cm, 3*cm, 3*cm, 3.5*cm], _GENERAL_BANDS_TABLE_STYLE)
                 story.append(bands_table)
                 story.append(Spacer(1, 15))
                 
@@ -568,15 +1123,7 @@ class PDFReportGenerator:
                      f"{'+' if wvw['difference_pct'] > 0 else ''}{wvw['difference_pct']:.1f}%"]
                 ]
                 
-                comp_table = Table(comparison_data, colWidths=[5*cm, 4*cm, 4*cm])
-                comp_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16a085')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#d5f4e6')),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-                ]))
+                comp_table = _text_table(comparison_data, [5*cm, 4*cm, 4*cm], _WEEKEND_TABLE_STYLE)
                 story.append(comp_table)
                 story.append(Spacer(1, 20))
         
@@ -628,18 +1175,7 @@ class PDFReportGenerator:
                 ["Equivalente Auto", f"{environmental['km_car_equivalent']:.0f} km", "Distanza percorribile con stesse emissioni"]
             ]
             
-            env_table = Table(env_data, colWidths=[4.5*cm, 3.5*cm, 5.5*cm])
-            env_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#d5f4e6')),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-            ]))
+            env_table = _text_table(env_data, [4.5*cm, 3.5*cm, 5.5*cm], _GENERAL_ENV_TABLE_STYLE)
             story.append(env_table)
             story.append(Spacer(1, 20))
         
@@ -665,9 +1201,8 @@ class PDFReportGenerator:
                     f"(media: {predictions['best_days_avg']:.2f} kWh)"
                 )
             
-            for item in pred_items:
-                story.append(Paragraph(item, self.styles['Normal']))
-                story.append(Spacer(1, 5))
+            if pred_items:
+                story.append(Paragraph('<br/>'.join(pred_items), self.styles['ListText']))
             
             story.append(Spacer(1, 20))
         
@@ -688,18 +1223,7 @@ class PDFReportGenerator:
                     ["Stabilità", f"{v['stability_pct']:.1f}%", "% valori nel range 220-240V"]
                 ]
                 
-                voltage_table = Table(voltage_data, colWidths=[4*cm, 3*cm, 6*cm])
-                voltage_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e67e22')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#fef5e7')),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-                ]))
+                voltage_table = _text_table(voltage_data, [4*cm, 3*cm, 6*cm], _VOLTAGE_TABLE_STYLE)
                 story.append(voltage_table)
                 story.append(Spacer(1, 15))
             
@@ -724,43 +1248,14 @@ class PDFReportGenerator:
         # Trend analysis
         story.append(Paragraph("Analisi dei Trend", self.styles['SubTitle']))
         
-        trend_analysis = [
-            "• <b>Monitoraggio continuo</b>: Implementare sistema di monitoraggio in tempo reale",
-            "• <b>Identificazione pattern</b>: Analizzare ricorrenze settimanali e mensili",
-            "• <b>Ottimizzazione oraria</b>: Spostare carichi non critici nelle ore di minor costo",
-            "• <b>Gestione picchi</b>: Implementare strategie di load shedding",
-            "• <b>Manutenzione preventiva</b>: Monitorare efficienza degli impianti"
-        ]
-        
-        for item in trend_analysis:
-            story.append(Paragraph(item, self.styles['Normal']))
-            story.append(Spacer(1, 3))
+        story.append(self.static_list(_TREND_ITEMS, 'ListText'))
         
         story.append(Spacer(1, 15))
         
         # Action plan
         story.append(Paragraph("Piano di Azione Raccomandato", self.styles['SubTitle']))
         
-        action_plan = [
-            ["Fase", "Attività", "Timeline", "Responsabile"],
-            ["1", "Analisi approfondita carichi", "2 settimane", "Team Energia"],
-            ["2", "Identificazione ottimizzazioni", "1 settimana", "Team Energia"],
-            ["3", "Pianificazione interventi", "1 mese", "Management"],
-            ["4", "Implementazione", "2-3 mesi", "Team Tecnico"],
-            ["5", "Monitoraggio risultati", "Continuo", "Team Energia"]
-        ]
-        
-        action_table = Table(action_plan, colWidths=[1.5*cm, 6*cm, 3*cm, 3*cm])
-        action_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#e8f6f3')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-        ]))
+        action_table = _text_table(_ACTION_PLAN_ROWS, _ACTION_PLAN_COL_WIDTHS, _ACTION_TABLE_STYLE)
         
         story.append(action_table)
         story.append(Spacer(1, 20))
@@ -768,15 +1263,7 @@ class PDFReportGenerator:
         # Savings estimate
         story.append(Paragraph("Stima Risparmi Potenziali", self.styles['SubTitle']))
         
-        savings_text = """
-        <b>• Riduzione picchi del 20%</b>: Risparmio sui costi di potenza contrattuale<br/>
-        <b>• Ottimizzazione oraria</b>: -10/15% su costo energia tramite tariffe biorarie<br/>
-        <b>• Miglioramento efficienza</b>: -5/10% su consumi base<br/>
-        <b>• ROI stimato</b>: 12-18 mesi per interventi di media entità<br/>
-        <b>• Risparmio annuo stimato</b>: 15-25% sulla bolletta energetica
-        """
-        
-        story.append(Paragraph(savings_text, self.styles['HighlightText']))
+        story.append(self.static_paragraph(_GENERAL_SAVINGS_TEXT, 'HighlightText'))
         
         story.append(PageBreak())
         
@@ -787,24 +1274,11 @@ class PDFReportGenerator:
         story.append(Paragraph("Informazioni Tecniche", self.styles['SubTitle']))
         
         tech_info = [
-            ["Parametro", "Valore", "Descrizione"],
-            ["Dispositivo", "Shelly EM", "Monitor energia trifase"],
-            ["Campionamento", "60 secondi", "Intervallo tra misurazioni"],
-            ["Metriche", "15+ parametri", "Tensione, corrente, potenza, energia"],
-            ["Risoluzione", "0.1W / 0.001kWh", "Precisione misurazioni"],
-            ["Formato dati", "CSV timestamp", "Compatibile con tutti i software"],
-            ["Periodo analisi", f"{analysis.get('days_analyzed', 0)} giorni", "Copertura temporale"]
+            *_TECH_INFO_ROWS,
+            ("Periodo analisi", f"{analysis.get('days_analyzed', 0)} giorni", "Copertura temporale")
         ]
         
-        tech_table = Table(tech_info, colWidths=[4*cm, 3*cm, 6*cm])
-        tech_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7f8c8d')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-        ]))
+        tech_table = _text_table(tech_info, [4*cm, 3*cm, 6*cm], _TECH_TABLE_STYLE)
         
         story.append(tech_table)
         story.append(Spacer(1, 20))
@@ -812,24 +1286,13 @@ class PDFReportGenerator:
         # Final notes
         story.append(Paragraph("Note Finali e Disclaimer", self.styles['SubTitle']))
         
-        disclaimer = """
-        <b>Disclaimer:</b> Questo report è stato generato automaticamente sulla base dei dati forniti.
-        I valori sono indicativi e devono essere verificati da personale tecnico qualificato.
-        
-        <b>Note:</b> I dati sono stati corretti automaticamente per eventuali discrepanze temporali del dispositivo.
-        Le raccomandazioni sono basate su analisi statistica e best practice del settore.
-        
-        <b>Contatti:</b> Per ulteriori informazioni o analisi personalizzate, contattare il team di analisi energetica.
-        """
-        
-        story.append(Paragraph(disclaimer, self.styles['Normal']))
+        story.append(self.static_paragraph(_GENERAL_DISCLAIMER_TEXT, 'Normal'))
         
         # Final footer
         story.append(Spacer(1, 20))
-        story.append(Paragraph("_" * 80, self.styles['LineStyle']))
+        story.append(self.static_paragraph("_" * 80, 'LineStyle'))
         story.append(Spacer(1, 5))
-        story.append(Paragraph("© 2024 Shelly Energy Analyzer - Report Generale Completo", 
-                              self.styles['FooterStyle']))
+        story.append(self.static_paragraph("© 2024 Shelly Energy Analyzer - Report Generale Completo", 'FooterStyle'))
         
         # PDF Generation
         try:
@@ -858,9 +1321,26 @@ class ShellyEnergyReport:
         self.correct_timestamps = correct_timestamps
         self.data_files = []
         self.all_data = None
+        self._clock_dependent = False
+        self._stats_owner = None
+        self._stats = {}
         self.pdf_generator = PDFReportGenerator()
         self.selected_entities = self._load_selected_entities()
     
+    def __getstate__(self):
+        """Pickle for worker processes: no full dataset (each worker gets its own slice)
+        and no stylesheet (ReportLab styles are not picklable, rebuilt on unpickle)."""
+        state = self.__dict__.copy()
+        state['all_data'] = None
+        state['_stats_owner'] = None
+        state['_stats'] = {}
+        del state['pdf_generator']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pdf_generator = PDFReportGenerator()
+    
     def _load_selected_entities(self):
         """Load selected entities from selection file if exists."""
         selection_file = Path("/data/selected_entities.json")
@@ -880,7 +1360,8 @@ class ShellyEnergyReport:
                     
                     if entities:
                         print(f"[INFO] Loaded {len(entities)} selected entities from {selection_file}")
-                        return entities
+                        # Set for O(1) membership checks when filtering devices
+                        return frozenset(entities)
             except Exception as e:
                 print(f"[WARN] Could not load selected entities: {e}")
         
@@ -888,8 +1369,9 @@ class ShellyEnergyReport:
         
     def _find_data_files(self):
         """Find all CSV files in the data folder."""
-        csv_files = list(self.data_dir.glob("*.csv"))
-        csv_files.extend(list(self.data_dir.glob("emdata_*.csv")))
+        # Single directory read; emdata_*.csv files are already matched by *.csv
+        with os.scandir(self.data_dir) as entries:
+            csv_files = [Path(entry.path) for entry in entries if entry.name.endswith('.csv') and entry.is_file()]
         
         if not csv_files:
             raise FileNotFoundError(f"Nessun file CSV trovato in {self.data_dir}")
@@ -906,42 +1388,59 @@ class ShellyEnergyReport:
         print(f"[INFO] Loading: {file_path.name}")
         
         try:
-            df = pd.read_csv(file_path, encoding=self.encoding)
-        except UnicodeDecodeError:
-            for enc in ['latin-1', 'iso-8859-1', 'cp1252']:
-                try:
-                    df = pd.read_csv(file_path, encoding=enc)
-                    self.encoding = enc
-                    print(f"    - Encoding detected: {enc}")
-                    break
-                except:
-                    continue
-            else:
-                raise ValueError(f"Impossibile leggere il file {file_path.name}")
+            # Parser Arrow multithread: stessi dtype e NaN del parser C
+            df = pd.read_csv(file_path, encoding=self.encoding, engine='pyarrow')
+            # Testo non decodificabile: Arrow non fallisce ma restituisce la colonna come bytes
+            if any(isinstance(df[col].dropna().iat[0], bytes)
+                   for col in df.columns[df.dtypes == object] if df[col].notna().any()):
+                raise UnicodeDecodeError(self.encoding, b'', 0, 1, "binary column from Arrow")
+        except Exception:
+            # Encoding non valido o righe irregolari: parser standard con rilevamento encoding
+            df = self._read_csv_fallback(file_path)
         
         df['source_file'] = file_path.name
         
         if 'timestamp' not in df.columns:
             print(f"    [WARN] No 'timestamp' column found")
             df['timestamp'] = int(datetime.now().timestamp()) + df.index * 60
+            self._clock_dependent = True
         
         return df
     
+    def _read_csv_fallback(self, file_path: Path) -> pd.DataFrame:
+        """Read a CSV with the standard parser, trying other encodings on decode errors."""
+        try:
+            return pd.read_csv(file_path, encoding=self.encoding)
+        except UnicodeDecodeError:
+            for enc in ['latin-1', 'iso-8859-1', 'cp1252']:
+                try:
+                    df = pd.read_csv(file_path, encoding=enc)
+                    self.encoding = enc
+                    print(f"    - Encoding detected: {enc}")
+                    return df
+                except:
+                    continue
+            raise ValueError(f"Impossibile leggere il file {file_path.name}")
+    
     def _correct_timestamps_in_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Correct erroneous timestamps."""
         if not self.correct_timestamps or 'timestamp' not in df.columns:
             return df
         
-        df['datetime_raw'] = pd.to_datetime(df['timestamp'], unit='s')
-        latest_timestamp_raw = df['datetime_raw'].max()
+        raw_ns = _epoch_seconds_to_ns(df['timestamp'].to_numpy())
+        df['datetime_raw'] = raw_ns.view('datetime64[ns]')
+        latest_timestamp_raw = pd.Timestamp(df['datetime_raw'].max())
         current_time = datetime.now()
         time_diff = current_time - latest_timestamp_raw
         
-        if abs(time_diff.days) > 30:
+        if _needs_time_correction(time_diff):
             print(f"    [INFO] Timestamp correction: {abs(time_diff.days)} days difference")
+            self._clock_dependent = True
             correction_seconds = time_diff.total_seconds()
             df['timestamp_corrected'] = df['timestamp'] + correction_seconds
-            df['datetime'] = pd.to_datetime(df['timestamp_corrected'], unit='s')
+            # Correzione in nanosecondi interi sullo stesso array, senza riconvertire
+            corrected_ns = np.where(raw_ns == _NAT_NS, _NAT_NS, raw_ns + time_diff.value)
+            df['datetime'] = corrected_ns.view('datetime64[ns]')
         else:
             df['datetime'] = df['datetime_raw']
         
@@ -953,25 +1452,47 @@ class ShellyEnergyReport:
             return df
         
         if 'datetime' not in df.columns and 'timestamp' in df.columns:
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
+            df['datetime'] = _epoch_seconds_to_ns(df['timestamp'].to_numpy()).view('datetime64[ns]')
         elif 'datetime' not in df.columns:
             start_time = datetime.now() - timedelta(hours=len(df)/60)
             df['datetime'] = pd.date_range(start=start_time, periods=len(df), freq='1min')
         
-        df['date'] = df['datetime'].dt.date
-        df['hour'] = df['datetime'].dt.hour
-        df['day'] = df['datetime'].dt.day
-        df['month'] = df['datetime'].dt.month
-        df['year'] = df['datetime'].dt.year
-        df['weekday'] = df['datetime'].dt.weekday
+        dt64 = df['datetime'].to_numpy().astype('datetime64[ns]')
+        if np.isnat(dt64).any():
+            df['date'] = df['datetime'].dt.date
+            df['hour'] = df['datetime'].dt.hour
+            df['day'] = df['datetime'].dt.day
+            df['month'] = df['datetime'].dt.month
+            df['year'] = df['datetime'].dt.year
+            df['weekday'] = df['datetime'].dt.weekday
+        else:
+            # Scomposizione con cast datetime64 (h/D/M) invece di cinque accessor .dt
+            days = dt64.astype('datetime64[D]')
+            # Un oggetto date per giorno distinto (non per riga), già come category
+            unique_days, day_codes = np.unique(days, return_inverse=True)
+            df['date'] = pd.Categorical.from_codes(day_codes, categories=unique_days.astype(object))
+            months = dt64.astype('datetime64[M]')
+            month_index = months.view('int64')
+            df['hour'] = (dt64.astype('datetime64[h]').view('int64') % 24).astype('int8')
+            df['day'] = ((days - months.astype('datetime64[D]')).view('int64') + 1).astype('int8')
+            df['month'] = (month_index % 12 + 1).astype('int8')
+            df['year'] = (month_index // 12 + 1970).astype('int16')
+            # 1970-01-01 era un giovedi' (weekday 3)
+            df['weekday'] = ((days.view('int64') + 3) % 7).astype('int8')
         
         if 'total_act_energy' in df.columns:
             df['energy_kwh'] = df['total_act_energy'] / 1000
         
         if all(col in df.columns for col in ['total_act_energy', 'lag_react_energy']):
-            df['power_factor_est'] = df['total_act_energy'] / np.sqrt(
-                df['total_act_energy']**2 + df['lag_react_energy']**2 + 1e-6
-            )
+            active = df['total_act_energy'].to_numpy(dtype=float)
+            reactive = df['lag_react_energy'].to_numpy(dtype=float)
+            # a / sqrt(a² + b² + 1e-6) in un solo buffer, senza un temporaneo per ogni operazione
+            pf = active * active
+            pf += reactive * reactive
+            pf += 1e-6
+            np.sqrt(pf, out=pf)
+            np.divide(active, pf, out=pf)
+            df['power_factor_est'] = pf
         
         return df
     
@@ -984,40 +1505,29 @@ class ShellyEnergyReport:
         
         # Analisi fasce orarie
         if 'hour' in df.columns:
-            hourly_avg = df.groupby('hour')['max_act_power'].mean()
+            rows, power_sum, power_count, energy_sum = self._hourly_profile(df)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                hourly_avg = pd.Series(power_sum / power_count)[rows > 0]
             analysis['peak_hour'] = int(hourly_avg.idxmax())
             analysis['lowest_hour'] = int(hourly_avg.idxmin())
             analysis['peak_hour_power'] = float(hourly_avg.max())
             analysis['lowest_hour_power'] = float(hourly_avg.min())
             
-            # Fasce orarie (notte, mattina, pomeriggio, sera)
-            night_mask = (df['hour'] >= 0) & (df['hour'] < 6)
-            morning_mask = (df['hour'] >= 6) & (df['hour'] < 12)
-            afternoon_mask = (df['hour'] >= 12) & (df['hour'] < 18)
-            evening_mask = (df['hour'] >= 18) & (df['hour'] < 24)
-            
-            analysis['time_bands'] = {
-                'night': {
-                    'avg_power': float(df[night_mask]['max_act_power'].mean()) if night_mask.any() else 0,
-                    'total_energy': float(df[night_mask]['total_act_energy'].sum() / 1000) if night_mask.any() else 0,
-                    'percentage': float((df[night_mask]['total_act_energy'].sum() / df['total_act_energy'].sum() * 100)) if night_mask.any() else 0
-                },
-                'morning': {
-                    'avg_power': float(df[morning_mask]['max_act_power'].mean()) if morning_mask.any() else 0,
-                    'total_energy': float(df[morning_mask]['total_act_energy'].sum() / 1000) if morning_mask.any() else 0,
-                    'percentage': float((df[morning_mask]['total_act_energy'].sum() / df['total_act_energy'].sum() * 100)) if morning_mask.any() else 0
-                },
-                'afternoon': {
-                    'avg_power': float(df[afternoon_mask]['max_act_power'].mean()) if afternoon_mask.any() else 0,
-                    'total_energy': float(df[afternoon_mask]['total_act_energy'].sum() / 1000) if afternoon_mask.any() else 0,
-                    'percentage': float((df[afternoon_mask]['total_act_energy'].sum() / df['total_act_energy'].sum() * 100)) if afternoon_mask.any() else 0
-                },
-                'evening': {
-                    'avg_power': float(df[evening_mask]['max_act_power'].mean()) if evening_mask.any() else 0,
-                    'total_energy': float(df[evening_mask]['total_act_energy'].sum() / 1000) if evening_mask.any() else 0,
-                    'percentage': float((df[evening_mask]['total_act_energy'].sum() / df['total_act_energy'].sum() * 100)) if evening_mask.any() else 0
-                }
-            }
+            # Fasce orarie (notte, mattina, pomeriggio, sera): 6 ore consecutive ciascuna
+            total_energy = np.nansum(df['total_act_energy'].to_numpy(dtype=float))
+            analysis['time_bands'] = {}
+            for band, start in (('night', 0), ('morning', 6), ('afternoon', 12), ('evening', 18)):
+                hours = slice(start, start + 6)
+                if rows[hours].sum() == 0:
+                    analysis['time_bands'][band] = {'avg_power': 0, 'total_energy': 0, 'percentage': 0}
+                    continue
+                band_energy = energy_sum[hours].sum()
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    analysis['time_bands'][band] = {
+                        'avg_power': float(power_sum[hours].sum() / power_count[hours].sum()),
+                        'total_energy': float(band_energy / 1000),
+                        'percentage': float(band_energy / total_energy * 100)
+                    }
         
         # Analisi weekend vs feriali
         if 'weekday' in df.columns:
@@ -1026,11 +1536,11 @@ class ShellyEnergyReport:
             
             if weekday_mask.any() and weekend_mask.any():
                 analysis['weekday_vs_weekend'] = {
-                    'weekday_avg': float(df[weekday_mask].groupby('date')['total_act_energy'].sum().mean() / 1000),
-                    'weekend_avg': float(df[weekend_mask].groupby('date')['total_act_energy'].sum().mean() / 1000),
-                    'difference_pct': float(((df[weekend_mask].groupby('date')['total_act_energy'].sum().mean() - 
-                                              df[weekday_mask].groupby('date')['total_act_energy'].sum().mean()) /
-                                             df[weekday_mask].groupby('date')['total_act_energy'].sum().mean() * 100))
+                    'weekday_avg': float(df[weekday_mask].groupby('date', observed=True)['total_act_energy'].sum().mean() / 1000),
+                    'weekend_avg': float(df[weekend_mask].groupby('date', observed=True)['total_act_energy'].sum().mean() / 1000),
+                    'difference_pct': float(((df[weekend_mask].groupby('date', observed=True)['total_act_energy'].sum().mean() - 
+                                              df[weekday_mask].groupby('date', observed=True)['total_act_energy'].sum().mean()) /
+                                             df[weekday_mask].groupby('date', observed=True)['total_act_energy'].sum().mean() * 100))
                 }
         
         return analysis
@@ -1043,11 +1553,12 @@ class ShellyEnergyReport:
             return anomalies
         
         # Picco massimo assoluto
-        max_power_idx = df['max_act_power'].idxmax()
+        # Positional lookup: the datetime index may contain duplicate timestamps
+        peak_row = df.iloc[int(np.nanargmax(df['max_act_power'].to_numpy(dtype=float)))]
         anomalies['absolute_peak'] = {
-            'value': float(df.loc[max_power_idx, 'max_act_power']),
-            'timestamp': str(df.loc[max_power_idx, 'datetime']) if 'datetime' in df.columns else 'N/A',
-            'date': str(df.loc[max_power_idx, 'date']) if 'date' in df.columns else 'N/A'
+            'value': float(peak_row['max_act_power']),
+            'timestamp': str(peak_row['datetime']) if 'datetime' in df.columns else 'N/A',
+            'date': str(peak_row['date']) if 'date' in df.columns else 'N/A'
         }
         
         # Consumi notturni anomali (00:00-06:00)
@@ -1065,7 +1576,11 @@ class ShellyEnergyReport:
                     }
         
         # Top 5 picchi
-        top_peaks = df.nlargest(5, 'max_act_power')[['datetime', 'max_act_power']] if 'datetime' in df.columns else pd.DataFrame()
+        if 'datetime' in df.columns:
+            peak_pos = _top_k_positions(df['max_act_power'].to_numpy(dtype=float), 5)
+            top_peaks = df.iloc[peak_pos][['datetime', 'max_act_power']]
+        else:
+            top_peaks = pd.DataFrame()
         if not top_peaks.empty:
             anomalies['top_5_peaks'] = [
                 {'timestamp': str(row['datetime']), 'power': float(row['max_act_power'])} 
@@ -1081,20 +1596,20 @@ class ShellyEnergyReport:
         if len(df) == 0 or 'total_act_energy' not in df.columns:
             return impact
         
-        total_kwh = df['total_act_energy'].sum() / 1000
+        total_kwh = np.nansum(df['total_act_energy'].to_numpy(dtype=float)) / 1000
         
         # CO2 emessa (media Italia: 0.233 kg CO2/kWh)
         co2_factor = 0.233
         co2_kg = total_kwh * co2_factor
-        impact['co2_kg'] = round(co2_kg, 2)
         
         # Alberi necessari per compensare (1 albero assorbe ~22 kg CO2/anno)
         trees_per_year = co2_kg / 22
-        impact['trees_needed'] = round(trees_per_year, 2)
         
         # Equivalente km in auto (media: 0.12 kg CO2/km)
         km_equivalent = co2_kg / 0.12
-        impact['km_car_equivalent'] = round(km_equivalent, 0)
+        
+        impact['co2_kg'], impact['trees_needed'] = np.round([co2_kg, trees_per_year], 2).tolist()
+        impact['km_car_equivalent'] = float(np.round(km_equivalent))
         
         return impact
     
@@ -1106,17 +1621,17 @@ class ShellyEnergyReport:
             return predictions
         
         # Consumo giornaliero
-        daily_consumption = df.groupby('date')['total_act_energy'].sum() / 1000
+        daily_consumption = self._daily_energy_kwh(df)
         
         if len(daily_consumption) < 3:
             return predictions
         
         # Media ultimi 7 giorni
         last_7_days = daily_consumption.tail(7).mean()
-        predictions['avg_daily_last_7_days'] = round(last_7_days, 2)
         
         # Proiezione mensile
-        predictions['projected_monthly'] = round(last_7_days * 30, 2)
+        predictions['avg_daily_last_7_days'], predictions['projected_monthly'] = \
+            np.round([last_7_days, last_7_days * 30], 2).tolist()
         
         # Trend (ultimi 7 giorni vs 7 precedenti)
         if len(daily_consumption) >= 14:
@@ -1130,9 +1645,11 @@ class ShellyEnergyReport:
         
         # Giorni migliori (minor consumo)
         if len(daily_consumption) >= 3:
-            best_days_idx = daily_consumption.nsmallest(3).index
-            predictions['best_days'] = [str(d) for d in best_days_idx]
-            predictions['best_days_avg'] = round(daily_consumption.nsmallest(3).mean(), 2)
+            best_days = daily_consumption.iloc[
+                _top_k_positions(daily_consumption.to_numpy(dtype=float), 3, largest=False)
+            ]
+            predictions['best_days'] = [str(d) for d in best_days.index]
+            predictions['best_days_avg'] = round(best_days.mean(), 2)
         
         return predictions
     
@@ -1145,47 +1662,131 @@ class ShellyEnergyReport:
         
         # Analisi tensione
         if 'avg_voltage' in df.columns:
-            quality['voltage'] = {
-                'min': round(df['avg_voltage'].min(), 1),
-                'max': round(df['avg_voltage'].max(), 1),
-                'avg': round(df['avg_voltage'].mean(), 1),
-                'std': round(df['avg_voltage'].std(), 2)
-            }
+            v = df['avg_voltage'].to_numpy(dtype=float)
             
             # Stabilità tensione (% dentro range 220-240V)
-            stable_voltage = df[(df['avg_voltage'] >= 220) & (df['avg_voltage'] <= 240)]
-            stability_pct = (len(stable_voltage) / len(df) * 100)
-            quality['voltage']['stability_pct'] = round(stability_pct, 1)
+            stability_pct = np.count_nonzero((v >= 220) & (v <= 240)) / len(v) * 100
+            
+            v_min, v_max, v_avg, stability_pct = np.round(
+                [np.nanmin(v), np.nanmax(v), np.nanmean(v), stability_pct], 1
+            ).tolist()
+            quality['voltage'] = {
+                'min': v_min,
+                'max': v_max,
+                'avg': v_avg,
+                'std': float(np.round(np.nanstd(v, ddof=1), 2)),
+                'stability_pct': stability_pct
+            }
         
         # Fattore di potenza
         if 'power_factor_est' in df.columns:
-            pf_data = df[df['power_factor_est'].notna()]
-            if len(pf_data) > 0:
-                quality['power_factor'] = {
-                    'min': round(pf_data['power_factor_est'].min(), 3),
-                    'max': round(pf_data['power_factor_est'].max(), 3),
-                    'avg': round(pf_data['power_factor_est'].mean(), 3)
-                }
+            pf = df['power_factor_est'].to_numpy(dtype=float)
+            pf = pf[~np.isnan(pf)]
+            if len(pf) > 0:
+                pf_min, pf_max, pf_avg = np.round([pf.min(), pf.max(), pf.mean()], 3).tolist()
+                quality['power_factor'] = {'min': pf_min, 'max': pf_max, 'avg': pf_avg}
         
         return quality
     
+    def _data_cache_key(self) -> str:
+        """Key of the combined data: name, mtime and size of the CSV files plus load settings."""
+        files = [(f.name, f.stat().st_mtime_ns, f.stat().st_size) for f in self.data_files]
+        return hashlib.sha1(repr((files, self.correct_timestamps, _DATA_CACHE_VERSION, pd.__version__)).encode()).hexdigest()
+    
+    def _data_cache_path(self) -> Path:
+        """Parquet cache path keyed by name, mtime and size of the CSV files."""
+        return self.data_dir / '.cache' / f"{_DATA_CACHE_PREFIX}{self._data_cache_key()}.parquet"
+    
+    def _save_data_cache(self, cache_path: Path):
+        """Write the combined data to the cache (tmp + rename, never a partial file)."""
+        if self._clock_dependent:
+            # Correzione o timestamp sintetici relativi a "adesso": non riutilizzabili in un'esecuzione successiva
+            return
+        try:
+            table = pa.Table.from_pandas(self.all_data)
+            if self.correct_timestamps and 'datetime_raw' in self.all_data.columns:
+                # Ultimo timestamp grezzo per file: a ogni lettura si rifà il controllo dei 30 giorni
+                latest = self.all_data.groupby('source_file', observed=True)['datetime_raw'].max()
+                latest_ns = [None if pd.isna(ts) else ts.value for ts in latest]
+                table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'latest_raw_ns': json.dumps(latest_ns).encode()})
+            cache_path.parent.mkdir(exist_ok=True)
+            # Solo i file di questa cache: .cache sta nella cartella dati dell'utente
+            for old_cache in cache_path.parent.glob(f"{_DATA_CACHE_PREFIX}*.parquet"):
+                old_cache.unlink()
+            tmp_path = cache_path.with_suffix('.tmp')
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"[WARN] Data cache not written: {e}")
+    
+    def _report_signature(self) -> str:
+        """Signature of the loaded data (CSV files key + report code version), '' if it depends on the clock."""
+        if self._clock_dependent:
+            return ''
+        return f"{self._data_cache_key()}:{_code_version()}"
+    
+    def _read_data_cache(self, cache_path: Path):
+        """Cached combined data, or None if today the timestamp correction would decide differently."""
+        table = pq.read_table(cache_path)
+        latest_ns = json.loads((table.schema.metadata or {}).get(b'latest_raw_ns', b'[]'))
+        now = datetime.now()
+        if any(ns is not None and _needs_time_correction(now - pd.Timestamp(ns)) for ns in latest_ns):
+            return None
+        return table.to_pandas()
+    
+    def _load_data_file(self, file_path: Path):
+        """Load, correct and prepare one CSV; the exception is returned (not raised) on failure."""
+        try:
+            df = self._load_and_correct_csv(file_path)
+            df = self._correct_timestamps_in_data(df)
+            return self._prepare_dataframe(df)
+        except Exception as e:
+            return e
+    
+    def _use_category_columns(self):
+        """Store days and device names of all_data as categoricals."""
+        if 'date' in self.all_data.columns:
+            # Giorni come category: i groupby per data usano codici interi invece di hash su oggetti
+            self.all_data['date'] = self.all_data['date'].astype('category')
+        
+        # Pochi dispositivi ripetuti su ogni riga: codici interi invece di stringhe Python
+        for col in ('entity_id', 'friendly_name'):
+            if col in self.all_data.columns:
+                self.all_data[col] = self.all_data[col].astype('category')
+    
     def load_all_data(self) -> pd.DataFrame:
         """Load and combine all data."""
         print("\n[INFO] Loading and combining all data...")
         
         self._find_data_files()
+        self._clock_dependent = False
         
-        all_dfs = []
-        for file_path in self.data_files:
+        cache_path = self._data_cache_path()
+        if cache_path.exists():
             try:
-                df = self._load_and_correct_csv(file_path)
-                df = self._correct_timestamps_in_data(df)
-                df = self._prepare_dataframe(df)
-                all_dfs.append(df)
-                print(f"[INFO] {file_path.name}: {len(df)} rows")
+                cached = self._read_data_cache(cache_path)
+                if cached is not None:
+                    self.all_data = cached
+                    # Parquet restituisce 'date' come object: stessi dtype del percorso CSV
+                    self._use_category_columns()
+                    print(f"[INFO] Data loaded from cache: {len(self.all_data)} total rows")
+                    return self.all_data
+                print("[INFO] Data cache out of date (timestamp correction needed), reloading CSV files")
             except Exception as e:
-                print(f"[ERROR] Error in {file_path.name}: {e}")
+                print(f"[WARN] Data cache not readable, reloading CSV files: {e}")
+        
+        # Lettura e parsing dei file in thread: il parser rilascia il GIL durante l'I/O
+        max_workers = min(8, len(self.data_files)) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = list(executor.map(self._load_data_file, self.data_files))
+        
+        all_dfs = []
+        for file_path, df in zip(self.data_files, loaded):
+            if isinstance(df, Exception):
+                print(f"[ERROR] Error in {file_path.name}: {df}")
                 continue
+            all_dfs.append(df)
+            print(f"[INFO] {file_path.name}: {len(df)} rows")
         
         if not all_dfs:
             raise ValueError("No valid data found")
@@ -1194,14 +1795,57 @@ class ShellyEnergyReport:
         
         if 'datetime' in self.all_data.columns:
             self.all_data = self.all_data.sort_values('datetime')
+            # Sorted DatetimeIndex: per-day selection becomes a binary-searched slice
+            self.all_data.index = pd.DatetimeIndex(self.all_data['datetime'].to_numpy())
+        
+        self._use_category_columns()
         
         print(f"\n[INFO] Combined data: {len(self.all_data)} total rows")
         if 'datetime' in self.all_data.columns:
             print(f"[INFO] Period: {self.all_data['datetime'].min()} - {self.all_data['datetime'].max()}")
             print(f"[INFO] Unique days: {self.all_data['date'].nunique()}")
         
+        self._save_data_cache(cache_path)
+        
         return self.all_data
     
+    def _stats_cache(self, df: pd.DataFrame = None) -> Dict:
+        """Memo of reductions over one frame (all_data by default), reset when another frame is passed."""
+        df = self.all_data if df is None else df
+        if self._stats_owner is not df:
+            self._stats_owner = df
+            self._stats = {}
+        return self._stats
+    
+    def _daily_energy_kwh(self, df: pd.DataFrame = None) -> pd.Series:
+        """Daily energy (kWh) of a frame, grouped once and shared by analysis and plots."""
+        df = self.all_data if df is None else df
+        cache = self._stats_cache(df)
+        if 'daily_energy_kwh' not in cache:
+            if 'datetime' in df.columns and df['datetime'].is_monotonic_increasing:
+                cache['daily_energy_kwh'] = _sorted_daily_sum(df['date'], df['total_act_energy']) / 1000
+            else:
+                cache['daily_energy_kwh'] = df.groupby('date', observed=True)['total_act_energy'].sum() / 1000
+        return cache['daily_energy_kwh']
+    
+    def _hourly_profile(self, df: pd.DataFrame):
+        """Per-hour sums of a frame (see _hourly_sums), shared by consumption patterns and plots."""
+        cache = self._stats_cache(df)
+        if 'hourly_sums' not in cache:
+            energy = (df['total_act_energy'].to_numpy(dtype=float) if 'total_act_energy' in df.columns
+                      else np.full(len(df), np.nan))
+            cache['hourly_sums'] = _hourly_sums(
+                df['hour'].to_numpy(dtype=float), df['max_act_power'].to_numpy(dtype=float), energy
+            )
+        return cache['hourly_sums']
+    
+    def _power_stats(self) -> Dict:
+        """Mean/max/min of max_act_power over all_data in a single aggregation."""
+        cache = self._stats_cache()
+        if 'power_stats' not in cache:
+            cache['power_stats'] = self.all_data['max_act_power'].agg(['mean', 'max', 'min']).to_dict()
+        return cache['power_stats']
+    
     def _create_output_structure(self):
         """Create the output folder structure."""
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -1217,31 +1861,42 @@ class ShellyEnergyReport:
     
     def _analyze_daily_data(self, date: datetime.date) -> Dict:
         """Analyze data for a single day."""
-        day_data = self.all_data[self.all_data['date'] == date]
+        day = date.strftime('%Y-%m-%d')
+        day_data = self.all_data.loc[day:day]
         
         if len(day_data) == 0:
             return {}
         
+        # Riduzioni NaN-aware direttamente sugli array: niente dispatch di DataFrame.agg per giorno
+        columns = {
+            col: day_data[col].to_numpy(dtype=float)
+            for col in ('total_act_energy', 'max_act_power', 'min_act_power', 'avg_voltage', 'avg_current')
+            if col in day_data.columns
+        }
+
+        def stat(col, reduce):
+            return float(reduce(columns[col])) if col in columns else 0
+
         analysis = {
             'date': date.strftime('%Y-%m-%d'),
-            'total_energy_kwh': day_data['total_act_energy'].sum() / 1000 if 'total_act_energy' in day_data.columns else 0,
-            'avg_power_w': day_data['max_act_power'].mean() if 'max_act_power' in day_data.columns else 0,
-            'max_power_w': day_data['max_act_power'].max() if 'max_act_power' in day_data.columns else 0,
-            'min_power_w': day_data['min_act_power'].min() if 'min_act_power' in day_data.columns else 0,
-            'avg_voltage': day_data['avg_voltage'].mean() if 'avg_voltage' in day_data.columns else 0,
-            'avg_current': day_data['avg_current'].mean() if 'avg_current' in day_data.columns else 0,
+            'total_energy_kwh': stat('total_act_energy', np.nansum) / 1000,
+            'avg_power_w': stat('max_act_power', np.nanmean),
+            'max_power_w': stat('max_act_power', np.nanmax),
+            'min_power_w': stat('min_act_power', np.nanmin),
+            'avg_voltage': stat('avg_voltage', np.nanmean),
+            'avg_current': stat('avg_current', np.nanmean),
             'data_points': len(day_data)
         }
-        
-        if 'max_act_power' in day_data.columns:
-            peak_threshold = day_data['max_act_power'].quantile(0.95)
-            peaks = day_data[day_data['max_act_power'] > peak_threshold]
-            analysis['peak_count'] = len(peaks)
+
+        if 'max_act_power' in columns:
+            power = columns['max_act_power']
+            power = power[~np.isnan(power)]
+            peak_threshold = _quantile(power, 0.95)
+            analysis['peak_count'] = int((power > peak_threshold).sum())
             analysis['peak_threshold_w'] = peak_threshold
         
-        if 'hour' in day_data.columns and 'max_act_power' in day_data.columns:
-            hourly_stats = day_data.groupby('hour')['max_act_power'].agg(['mean', 'max', 'min']).round(1)
-            analysis['hourly_stats'] = hourly_stats.to_dict()
+        if 'hour' in day_data.columns and 'max_act_power' in columns:
+            analysis['hourly_stats'] = _hourly_stats(day_data['hour'].to_numpy(), columns['max_act_power'])
         
         return analysis
     
@@ -1252,58 +1907,61 @@ class ShellyEnergyReport:
         if len(day_data) == 0:
             return plot_paths
         
+        title_date = date.strftime('%d/%m/%Y')
+        file_date = date.strftime('%Y%m%d')
+        # Colonna potenza letta una volta come array per tutti e tre i grafici
+        power = day_data['max_act_power'].to_numpy(dtype=float) if 'max_act_power' in day_data.columns else None
+        
         # 1. Power trend
-        fig1, ax1 = plt.subplots(figsize=(12, 6))
-        if 'datetime' in day_data.columns and 'max_act_power' in day_data.columns:
-            ax1.plot(day_data['datetime'], day_data['max_act_power'], 'b-', linewidth=1.5, alpha=0.8)
-            ax1.set_title(f'Andamento Potenza - {date.strftime("%d/%m/%Y")}', fontsize=14, fontweight='bold')
+        fig1, ax1 = _reuse_figure((12, 6))
+        if 'datetime' in day_data.columns and power is not None:
+            ax1.plot(day_data['datetime'], power, 'b-', linewidth=1.5, alpha=0.8)
+            ax1.set_title(f'Andamento Potenza - {title_date}', fontsize=14, fontweight='bold')
             ax1.set_xlabel('Ora del Giorno', fontsize=12)
             ax1.set_ylabel('Potenza (W)', fontsize=12)
             ax1.grid(True, alpha=0.3)
             ax1.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-            plt.tight_layout()
-            plot_path = output_dir / f"potenza_{date.strftime('%Y%m%d')}.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            plot_path = output_dir / f"potenza_{file_date}.png"
+            _save_figure(fig1, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         # 2. Hourly profile
-        fig2, ax2 = plt.subplots(figsize=(10, 6))
-        if 'hour' in day_data.columns and 'max_act_power' in day_data.columns:
-            hourly_avg = day_data.groupby('hour')['max_act_power'].mean()
-            ax2.bar(hourly_avg.index, hourly_avg.values, alpha=0.7, color='steelblue')
-            ax2.set_title(f'Profilo Orario Consumi - {date.strftime("%d/%m/%Y")}', fontsize=14)
+        fig2, ax2 = _reuse_figure((10, 6))
+        if 'hour' in day_data.columns and power is not None:
+            rows, power_sum, power_count, _ = _hourly_sums(day_data['hour'].to_numpy(), power, power)
+            hours = np.flatnonzero(rows)
+            hourly_avg = np.divide(power_sum[hours], power_count[hours],
+                                   out=np.full(len(hours), np.nan), where=power_count[hours] > 0)
+            ax2.bar(hours, hourly_avg, alpha=0.7, color='steelblue')
+            ax2.set_title(f'Profilo Orario Consumi - {title_date}', fontsize=14)
             ax2.set_xlabel('Ora del Giorno', fontsize=12)
             ax2.set_ylabel('Potenza Media (W)', fontsize=12)
             ax2.set_xticks(range(0, 24, 2))
             ax2.grid(True, alpha=0.3, axis='y')
-            plt.tight_layout()
-            plot_path = output_dir / f"profilo_orario_{date.strftime('%Y%m%d')}.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            plot_path = output_dir / f"profilo_orario_{file_date}.png"
+            _save_figure(fig2, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         # 3. Power distribution
-        fig3, ax3 = plt.subplots(figsize=(10, 6))
-        if 'max_act_power' in day_data.columns:
-            ax3.hist(day_data['max_act_power'], bins=30, edgecolor='black', alpha=0.7, color='steelblue')
-            mean_power = day_data['max_act_power'].mean()
+        fig3, ax3 = _reuse_figure((10, 6))
+        if power is not None:
+            _hist_bars(ax3, power, bins=30)
+            mean_power = np.nanmean(power)
             ax3.axvline(mean_power, color='red', linestyle='--', label=f'Media: {mean_power:.1f} W')
-            ax3.set_title(f'Distribuzione Potenza - {date.strftime("%d/%m/%Y")}', fontsize=14)
+            ax3.set_title(f'Distribuzione Potenza - {title_date}', fontsize=14)
             ax3.set_xlabel('Potenza (W)', fontsize=12)
             ax3.set_ylabel('Frequenza', fontsize=12)
             ax3.legend()
             ax3.grid(True, alpha=0.3)
-            plt.tight_layout()
-            plot_path = output_dir / f"distribuzione_{date.strftime('%Y%m%d')}.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            plot_path = output_dir / f"distribuzione_{file_date}.png"
+            _save_figure(fig3, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         return plot_paths
     
     def _create_daily_report(self, date: datetime.date, analysis: Dict, day_data: pd.DataFrame):
         """Create complete report for a single day."""
+        title_date = date.strftime('%d/%m/%Y')
         date_dir = self.daily_reports_dir / date.strftime("%Y-%m-%d")
         date_dir.mkdir(exist_ok=True)
         
@@ -1312,32 +1970,33 @@ class ShellyEnergyReport:
         grafici_dir.mkdir(exist_ok=True)
         dati_dir.mkdir(exist_ok=True)
         
-        print(f"[INFO] Creating report for {date.strftime('%d/%m/%Y')}...")
+        print(f"[INFO] Creating report for {title_date}...")
         
         # Save data
-        day_data.to_csv(dati_dir / "dati_giornalieri.csv", index=False)
+        _write_csv(day_data, dati_dir / "dati_giornalieri.csv")
         
         # Create charts
         plot_paths = self._create_daily_plots(day_data, date, grafici_dir)
         
         # Save JSON statistics
-        with open(dati_dir / "statistiche.json", 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, default=str)
+        _write_json(dati_dir / "statistiche.json", analysis)
         
         # Create PDF
         pdf_path = self.pdf_generator.create_daily_pdf(analysis, date, date_dir, plot_paths, day_data)
         
         if pdf_path:
             # Also create a text version for reference
-            with open(date_dir / "riepilogo.txt", 'w', encoding='utf-8') as f:
-                f.write(f"Report Giornaliero - {date.strftime('%d/%m/%Y')}\n")
-                f.write(f"Energia totale: {analysis.get('total_energy_kwh', 0):.2f} kWh\n")
-                f.write(f"Potenza massima: {analysis.get('max_power_w', 0):.1f} W\n")
-                f.write(f"PDF disponibile: {pdf_path.name}\n")
+            summary = (
+                f"Report Giornaliero - {title_date}\n"
+                f"Energia totale: {analysis.get('total_energy_kwh', 0):.2f} kWh\n"
+                f"Potenza massima: {analysis.get('max_power_w', 0):.1f} W\n"
+                f"PDF disponibile: {pdf_path.name}\n"
+            )
+            (date_dir / "riepilogo.txt").write_text(summary, encoding='utf-8')
             
             print(f"[INFO] PDF report created: {pdf_path.name}")
         else:
-            print(f"[WARN] PDF report not created for {date.strftime('%d/%m/%Y')}")
+            print(f"[WARN] PDF report not created for {title_date}")
     
     def _create_general_plots(self, plots_dir: Path) -> List[Path]:
         """Create charts for the general report."""
@@ -1345,67 +2004,70 @@ class ShellyEnergyReport:
         
         # 1. Daily energy
         if 'date' in self.all_data.columns and 'total_act_energy' in self.all_data.columns:
-            fig1, ax1 = plt.subplots(figsize=(14, 7))
-            daily_energy = self.all_data.groupby('date')['total_act_energy'].sum() / 1000
+            fig1, ax1 = _reuse_figure((14, 7))
+            daily_energy = self._daily_energy_kwh()
             
-            ax1.bar(daily_energy.index.astype(str), daily_energy.values, alpha=0.7, color='steelblue')
+            ax1.bar(pd.to_datetime(daily_energy.index).strftime('%Y-%m-%d'), daily_energy.to_numpy(), alpha=0.7, color='steelblue')
             ax1.set_title('Energia Consumata per Giorno', fontsize=16, fontweight='bold')
             ax1.set_xlabel('Data', fontsize=12)
             ax1.set_ylabel('Energia (kWh)', fontsize=12)
             ax1.tick_params(axis='x', rotation=45)
             ax1.grid(True, alpha=0.3, axis='y')
-            plt.tight_layout()
             plot_path = plots_dir / "energia_giornaliera.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            _save_figure(fig1, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         # 2. Consumption heatmap
         if all(col in self.all_data.columns for col in ['date', 'hour', 'max_act_power']):
-            fig2, ax2 = plt.subplots(figsize=(12, 8))
+            fig2, ax2 = _reuse_figure((12, 8))
             
-            pivot_data = self.all_data.pivot_table(
-                values='max_act_power',
-                index='hour',
-                columns='date',
-                aggfunc='mean'
-            ).fillna(0)
+            pivot_data = (
+                self.all_data.groupby(['hour', 'date'], observed=True)['max_act_power']
+                .mean()
+                .unstack('date', fill_value=0)
+            )
             
-            sns.heatmap(pivot_data, cmap='YlOrRd', ax=ax2, cbar_kws={'label': 'Potenza Media (W)'})
+            # imshow draws one raster instead of seaborn's per-cell QuadMesh
+            im = ax2.imshow(pivot_data.to_numpy(), aspect='auto', cmap='YlOrRd', interpolation='nearest')
+            fig2.colorbar(im, ax=ax2, label='Potenza Media (W)')
+            date_labels = pd.to_datetime(pivot_data.columns).strftime('%Y-%m-%d')
+            step = max(1, -(-len(date_labels) // 40))  # thin labels on long histories
+            ax2.set_xticks(range(0, len(date_labels), step))
+            ax2.set_xticklabels(date_labels[::step], rotation=90)
+            ax2.set_yticks(range(len(pivot_data.index)))
+            ax2.set_yticklabels(pivot_data.index)
+            ax2.grid(False)
             ax2.set_title('Heatmap Consumi Orari - Storico Completo', fontsize=16, fontweight='bold')
             ax2.set_xlabel('Data', fontsize=12)
             ax2.set_ylabel('Ora del Giorno', fontsize=12)
-            plt.tight_layout()
             plot_path = plots_dir / "heatmap_consumi.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            _save_figure(fig2, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         # 3. Power distribution
         if 'max_act_power' in self.all_data.columns:
-            fig3, ax3 = plt.subplots(figsize=(10, 6))
-            ax3.hist(self.all_data['max_act_power'], bins=50, edgecolor='black', alpha=0.7, color='steelblue')
-            mean_power = self.all_data['max_act_power'].mean()
+            fig3, ax3 = _reuse_figure((10, 6))
+            _hist_bars(ax3, self.all_data['max_act_power'], bins=50)
+            mean_power = self._power_stats()['mean']
             ax3.axvline(mean_power, color='red', linestyle='--', label=f'Media: {mean_power:.1f} W')
             ax3.set_title('Distribuzione Potenze - Storico Completo', fontsize=16)
             ax3.set_xlabel('Potenza (W)', fontsize=12)
             ax3.set_ylabel('Frequenza', fontsize=12)
             ax3.legend()
             ax3.grid(True, alpha=0.3)
-            plt.tight_layout()
             plot_path = plots_dir / "distribuzione_potenze.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            _save_figure(fig3, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         return plot_paths
     
     def _analyze_general_data(self) -> Dict:
         """Analyze all combined data."""
+        power_stats = self._power_stats() if 'max_act_power' in self.all_data.columns else {}
         analysis = {
             'total_energy_kwh': self.all_data['total_act_energy'].sum() / 1000 if 'total_act_energy' in self.all_data.columns else 0,
-            'avg_power_w': self.all_data['max_act_power'].mean() if 'max_act_power' in self.all_data.columns else 0,
-            'max_power_w': self.all_data['max_act_power'].max() if 'max_act_power' in self.all_data.columns else 0,
+            'avg_power_w': power_stats.get('mean', 0),
+            'max_power_w': power_stats.get('max', 0),
             'days_analyzed': self.all_data['date'].nunique() if 'date' in self.all_data.columns else 0,
             'total_data_points': len(self.all_data),
             'date_range': {
@@ -1415,7 +2077,7 @@ class ShellyEnergyReport:
         }
         
         if 'date' in self.all_data.columns and 'total_act_energy' in self.all_data.columns:
-            daily_energy = self.all_data.groupby('date')['total_act_energy'].sum() / 1000
+            daily_energy = self._daily_energy_kwh()
             analysis['daily_energy_stats'] = {
                 'max': float(daily_energy.max()),
                 'min': float(daily_energy.min()),
@@ -1437,7 +2099,7 @@ class ShellyEnergyReport:
         return analysis
     
     def _create_general_report(self):
-        """Create general report - ALWAYS UPDATED."""
+        """Create general report - ALWAYS UPDATED (skipped when the data has not changed)."""
         print("\n[INFO] CREATING/UPDATING GENERAL REPORT")
         print("=" * 40)
         
@@ -1445,6 +2107,11 @@ class ShellyEnergyReport:
         general_dir = self.general_report_dir
         general_dir.mkdir(exist_ok=True)
         
+        signature = self._report_signature()
+        if _report_is_current(general_dir, "report_generale.pdf", signature):
+            print("[INFO] General report already up to date, skipped")
+            return general_dir
+        
         grafici_dir = general_dir / "grafici"
         dati_dir = general_dir / "dati"
         grafici_dir.mkdir(exist_ok=True)
@@ -1452,7 +2119,7 @@ class ShellyEnergyReport:
         
         # Save complete data
         data_file = dati_dir / "dati_completi.csv"
-        self.all_data.to_csv(data_file, index=False)
+        _write_csv(self.all_data, data_file)
         print(f"[INFO] Data saved: {data_file.name}")
         
         # Analysis
@@ -1460,8 +2127,7 @@ class ShellyEnergyReport:
         
         # Save statistics
         stats_file = dati_dir / "statistiche_generali.json"
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            json.dump(general_analysis, f, indent=2, default=str)
+        _write_json(stats_file, general_analysis)
         print(f"[INFO] Statistics saved: {stats_file.name}")
         
         # Create charts (always overwrite)
@@ -1479,19 +2145,22 @@ class ShellyEnergyReport:
         
         if pdf_path:
             # Update text summary
-            with open(general_dir / "riepilogo.txt", 'w', encoding='utf-8') as f:
-                f.write(f"REPORT GENERALE - AGGIORNATO AL: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-                f.write(f"Periodo: {general_analysis.get('date_range', {}).get('start', 'N/A')} - {general_analysis.get('date_range', {}).get('end', 'N/A')}\n")
-                f.write(f"Energia totale: {general_analysis.get('total_energy_kwh', 0):.2f} kWh\n")
-                f.write(f"Giorni analizzati: {general_analysis.get('days_analyzed', 0)}\n")
-                f.write(f"Dati totali: {general_analysis.get('total_data_points', 0):,} righe\n")
-                f.write(f"File CSV processati: {len(self.data_files)}\n")
-                f.write(f"PDF principale: {pdf_path.name}\n")
-                f.write(f"\nFILE DISPONIBILI:\n")
-                f.write(f"- report_generale.pdf (report completo)\n")
-                f.write(f"- dati_completi.csv (tutti i dati)\n")
-                f.write(f"- statistiche_generali.json (metriche)\n")
-                f.write(f"- grafici/ (immagini dei grafici)\n")
+            summary = (
+                f"REPORT GENERALE - AGGIORNATO AL: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+                f"Periodo: {general_analysis.get('date_range', {}).get('start', 'N/A')} - {general_analysis.get('date_range', {}).get('end', 'N/A')}\n"
+                f"Energia totale: {general_analysis.get('total_energy_kwh', 0):.2f} kWh\n"
+                f"Giorni analizzati: {general_analysis.get('days_analyzed', 0)}\n"
+                f"Dati totali: {general_analysis.get('total_data_points', 0):,} righe\n"
+                f"File CSV processati: {len(self.data_files)}\n"
+                f"PDF principale: {pdf_path.name}\n"
+                "\nFILE DISPONIBILI:\n"
+                "- report_generale.pdf (report completo)\n"
+                "- dati_completi.csv (tutti i dati)\n"
+                "- statistiche_generali.json (metriche)\n"
+                "- grafici/ (immagini dei grafici)\n"
+            )
+            (general_dir / "riepilogo.txt").write_text(summary, encoding='utf-8')
+            (general_dir / ".sig").write_text(signature)
             
             print(f"[INFO] General report UPDATED: {pdf_path.name}")
         else:
@@ -1499,8 +2168,9 @@ class ShellyEnergyReport:
         
         return general_dir
     
-    def _create_device_report(self, device_id: str, friendly_name: str, device_data: pd.DataFrame):
-        """Crea report specifico per un singolo dispositivo."""
+    def _create_device_report(self, device_id: str, friendly_name: str, device_data: pd.DataFrame,
+                              stats: pd.DataFrame = None):
+        """Crea report specifico per un singolo dispositivo (stats: sum/mean/max/min precalcolate)."""
         # Sanitize device_id for filename
         safe_device_name = device_id.replace('.', '_').replace('/', '_').replace(':', '_')
         
@@ -1515,7 +2185,10 @@ class ShellyEnergyReport:
         
         # Save device data
         data_file = dati_dir / f"{safe_device_name}_dati.csv"
-        device_data.to_csv(data_file, index=False)
+        _write_csv(device_data, data_file)
+        
+        # Keep only the columns the analysis touches: every scan below reads fewer bytes
+        device_data = device_data[[c for c in _DEVICE_COLUMNS if c in device_data.columns]]
         
         # Analyze device data
         analysis = {
@@ -1528,20 +2201,24 @@ class ShellyEnergyReport:
             }
         }
         
+        stat_cols = [c for c in _DEVICE_STAT_COLUMNS if c in device_data.columns]
+        if stat_cols and stats is None:
+            stats = device_data[stat_cols].agg(_DEVICE_STAT_FUNCS)
+        
         if 'total_act_energy' in device_data.columns:
-            analysis['total_energy_kwh'] = device_data['total_act_energy'].sum() / 1000
-            analysis['avg_power_w'] = device_data['total_act_energy'].mean()
-            analysis['max_power_w'] = device_data['total_act_energy'].max()
-            analysis['min_power_w'] = device_data['total_act_energy'].min()
+            energy = stats['total_act_energy']
+            analysis['total_energy_kwh'] = energy['sum'] / 1000
+            analysis['avg_power_w'] = energy['mean']
+            analysis['max_power_w'] = energy['max']
+            analysis['min_power_w'] = energy['min']
         
         if 'max_act_power' in device_data.columns:
-            analysis['peak_power_w'] = device_data['max_act_power'].max()
-            analysis['avg_power_w'] = device_data['max_act_power'].mean()
+            analysis['peak_power_w'] = stats.at['max', 'max_act_power']
+            analysis['avg_power_w'] = stats.at['mean', 'max_act_power']
         
         # Save statistics
         stats_file = dati_dir / f"{safe_device_name}_stats.json"
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, default=str)
+        _write_json(stats_file, analysis)
         
         # Create plots
         plot_paths = self._create_device_plots(device_data, grafici_dir, safe_device_name)
@@ -1555,6 +2232,31 @@ class ShellyEnergyReport:
         
         print(f"[INFO] Device report created: {pdf_path.name}")
     
+    def _create_device_reports(self, devices: List[tuple]):
+        """Create the (device_id, friendly_name, device_data, stats) reports, one worker process per device."""
+        max_workers = min(len(devices), os.cpu_count() or 1)
+        print(f"[INFO] Creating {len(devices)} device reports ({max_workers} workers)...")
+        
+        if max_workers == 1:
+            # Single core: no point paying for process startup and pickling
+            for device in devices:
+                try:
+                    self._create_device_report(*device)
+                except Exception as e:
+                    print(f"[ERROR] Error creating report for device {device[0]}: {e}")
+            return
+        
+        with _report_pool(max_workers) as executor:
+            futures = {
+                executor.submit(_build_device_report, self, *device): device[0]
+                for device in devices
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"[ERROR] Error creating report for device {futures[future]}: {e}")
+    
     def _create_device_plots(self, device_data: pd.DataFrame, output_dir: Path, device_name: str) -> List[Path]:
         """Create graphs for every device."""
         plot_paths = []
@@ -1564,7 +2266,7 @@ class ShellyEnergyReport:
         
         # 1. Power trend over time
         if 'datetime' in device_data.columns and 'max_act_power' in device_data.columns:
-            fig, ax = plt.subplots(figsize=(12, 6))
+            fig, ax = _reuse_figure((12, 6))
             ax.plot(device_data['datetime'], device_data['max_act_power'], 'b-', linewidth=1.5, alpha=0.8)
             ax.set_title(f'Andamento Potenza nel Tempo', fontsize=14, fontweight='bold')
             ax.set_xlabel('Data/Ora', fontsize=12)
@@ -1572,49 +2274,47 @@ class ShellyEnergyReport:
             ax.grid(True, alpha=0.3)
             ax.xaxis.set_major_formatter(mdates.DateFormatter('%d/%m %H:%M'))
             plt.xticks(rotation=45)
-            plt.tight_layout()
             plot_path = output_dir / f"{device_name}_power_trend.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            _save_figure(fig, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         # 2. Daily energy consumption
         if 'date' in device_data.columns and 'total_act_energy' in device_data.columns:
-            daily_energy = device_data.groupby('date')['total_act_energy'].sum() / 1000  # kWh
-            fig, ax = plt.subplots(figsize=(12, 6))
+            daily_energy = self._daily_energy_kwh(device_data)  # kWh
+            fig, ax = _reuse_figure((12, 6))
             ax.bar(range(len(daily_energy)), daily_energy.values, alpha=0.7, color='steelblue')
             ax.set_title(f'Consumo Energetico Giornaliero', fontsize=14, fontweight='bold')
             ax.set_xlabel('Giorno', fontsize=12)
             ax.set_ylabel('Energia (kWh)', fontsize=12)
             ax.set_xticks(range(len(daily_energy)))
-            ax.set_xticklabels([d.strftime('%d/%m') for d in daily_energy.index], rotation=45)
+            ax.set_xticklabels(pd.to_datetime(daily_energy.index).strftime('%d/%m'), rotation=45)
             ax.grid(True, alpha=0.3, axis='y')
-            plt.tight_layout()
             plot_path = output_dir / f"{device_name}_daily_energy.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            _save_figure(fig, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         # 3. Hourly profile
         if 'hour' in device_data.columns and 'max_act_power' in device_data.columns:
-            hourly_avg = device_data.groupby('hour')['max_act_power'].mean()
-            fig, ax = plt.subplots(figsize=(10, 6))
+            rows, power_sum, power_count, _ = self._hourly_profile(device_data)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                hourly_avg = pd.Series(power_sum / power_count)[rows > 0]
+            fig, ax = _reuse_figure((10, 6))
             ax.bar(hourly_avg.index, hourly_avg.values, alpha=0.7, color='steelblue')
             ax.set_title(f'Profilo Orario Medio', fontsize=14, fontweight='bold')
             ax.set_xlabel('Ora del Giorno', fontsize=12)
             ax.set_ylabel('Potenza Media (W)', fontsize=12)
             ax.set_xticks(range(0, 24, 2))
             ax.grid(True, alpha=0.3, axis='y')
-            plt.tight_layout()
             plot_path = output_dir / f"{device_name}_hourly_profile.png"
-            plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+            _save_figure(fig, plot_path)
             plot_paths.append(plot_path)
-            plt.close()
         
         return plot_paths
     
     def _create_device_pdf(self, analysis: Dict, pdf_path: Path, plot_paths: List[Path], device_data: pd.DataFrame):
         """Create PDF per device using the existing generator."""
+        styles = self.pdf_generator.styles
+        section_style, sub_style, normal_style = styles['SectionTitle'], styles['SubTitle'], styles['Normal']
         try:
             # Use the existing PDF generator with device-specific data
             doc = SimpleDocTemplate(
@@ -1630,9 +2330,9 @@ class ShellyEnergyReport:
             
             # COVER PAGE
             story.append(Spacer(1, 150))
-            story.append(Paragraph(f"REPORT DISPOSITIVO", self.pdf_generator.styles['MainTitle']))
+            story.append(Paragraph(f"REPORT DISPOSITIVO", styles['MainTitle']))
             story.append(Spacer(1, 15))
-            story.append(Paragraph(f"{analysis['friendly_name']}", self.pdf_generator.styles['SubTitle']))
+            story.append(Paragraph(f"{analysis['friendly_name']}", sub_style))
             story.append(Spacer(1, 50))
             
             cover_info = [
@@ -1642,20 +2342,13 @@ class ShellyEnergyReport:
             ]
             
             for info in cover_info:
-                story.append(Paragraph(info, 
-                    ParagraphStyle(
-                        name='CoverInfo',
-                        parent=self.pdf_generator.styles['Normal'],
-                        fontSize=11,
-                        alignment=1,
-                        spaceAfter=8
-                    )))
+                story.append(Paragraph(info, styles['CoverInfo']))
             
             story.append(PageBreak())
             
             # INDICE
             story.append(Spacer(1, 50))
-            story.append(Paragraph("INDICE DEL REPORT", self.pdf_generator.styles['SectionTitle']))
+            story.append(Paragraph("INDICE DEL REPORT", section_style))
             story.append(Spacer(1, 30))
             
             index_data = [
@@ -1667,25 +2360,13 @@ class ShellyEnergyReport:
             ]
             
             index_table = Table(index_data, colWidths=[1.5*cm, 14.5*cm])
-            index_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-                ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('LEFTPADDING', (1, 0), (1, -1), 10)
-            ]))
+            index_table.setStyle(_DEVICE_INDEX_TABLE_STYLE)
             
             story.append(index_table)
             story.append(PageBreak())
             
-            # Import KeepTogether
-            from reportlab.platypus import KeepTogether
-            
             # 1. SINTESI GENERALE
-            story.append(Paragraph("1. SINTESI GENERALE E METRICHE PRINCIPALI", self.pdf_generator.styles['SectionTitle']))
+            story.append(Paragraph("1. SINTESI GENERALE E METRICHE PRINCIPALI", section_style))
             story.append(Spacer(1, 15))
             
             summary_data = [
@@ -1698,30 +2379,19 @@ class ShellyEnergyReport:
             ]
             
             summary_table = Table(summary_data, colWidths=[5*cm, 4*cm, 2*cm])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
-            ]))
-            story.append(KeepTogether([summary_table]))
+            summary_table.setStyle(_DEVICE_SUMMARY_TABLE_STYLE)
+            story.append(summary_table)
             story.append(Spacer(1, 30))
             
             # 2. ANALISI DETTAGLIATA
-            story.append(Paragraph("2. ANALISI DETTAGLIATA PER GIORNO", self.pdf_generator.styles['SectionTitle']))
+            story.append(Paragraph("2. ANALISI DETTAGLIATA PER GIORNO", section_style))
             story.append(Spacer(1, 15))
             
             # Pattern di consumo
             patterns = self._analyze_consumption_patterns(device_data)
             if patterns and 'time_bands' in patterns:
                 bands_section = []
-                bands_section.append(Paragraph("Distribuzione Consumi per Fascia Oraria", self.pdf_generator.styles['SubTitle']))
+                bands_section.append(Paragraph("Distribuzione Consumi per Fascia Oraria", sub_style))
                 bands_section.append(Spacer(1, 8))
                 
                 bands_data = [
@@ -1745,18 +2415,7 @@ class ShellyEnergyReport:
                 ]
                 
                 bands_table = Table(bands_data, colWidths=[4*cm, 3*cm, 2.5*cm, 3.5*cm])
-                bands_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8e44ad')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('TOPPADDING', (0, 1), (-1, -1), 6),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-                ]))
+                bands_table.setStyle(_BANDS_TABLE_STYLE)
                 bands_section.append(bands_table)
                 
                 if 'peak_hour' in patterns:
@@ -1764,25 +2423,24 @@ class ShellyEnergyReport:
                     bands_section.append(Paragraph(
                         f"<b>Ora di picco:</b> {patterns['peak_hour']}:00 ({patterns['peak_hour_power']:.0f} W) | "
                         f"<b>Ora minimo:</b> {patterns['lowest_hour']}:00 ({patterns['lowest_hour_power']:.0f} W)",
-                        self.pdf_generator.styles['Normal']
+                        normal_style
                     ))
                 
                 story.append(KeepTogether(bands_section))
                 story.append(Spacer(1, 10))
             
             # Anomalie
-            from reportlab.platypus import KeepTogether
             anomalies = self._detect_anomalies(device_data)
             if anomalies:
                 anomalies_section = []
-                anomalies_section.append(Paragraph("Anomalie e Picchi", self.pdf_generator.styles['SubTitle']))
+                anomalies_section.append(Paragraph("Anomalie e Picchi", sub_style))
                 anomalies_section.append(Spacer(1, 8))
                 
                 if 'absolute_peak' in anomalies:
                     peak = anomalies['absolute_peak']
                     anomalies_section.append(Paragraph(
                         f"<b>Picco massimo:</b> {peak['value']:.0f} W il {peak['date']}",
-                        self.pdf_generator.styles['HighlightText']
+                        styles['HighlightText']
                     ))
                     anomalies_section.append(Spacer(1, 5))
                 
@@ -1790,18 +2448,17 @@ class ShellyEnergyReport:
                     night = anomalies['high_night_consumption']
                     anomalies_section.append(Paragraph(
                         f"<b>Consumo notturno elevato:</b> {night['night_avg']:.0f} W ({night['night_percentage']:.1f}% del diurno)",
-                        self.pdf_generator.styles['HighlightText']
+                        styles['HighlightText']
                     ))
                 
                 story.append(KeepTogether(anomalies_section))
                 story.append(Spacer(1, 10))
             
             # Impatto ambientale
-            from reportlab.platypus import KeepTogether
             environmental = self._calculate_environmental_impact(device_data)
             if environmental:
                 env_section = []
-                env_section.append(Paragraph("Impatto Ambientale", self.pdf_generator.styles['SubTitle']))
+                env_section.append(Paragraph("Impatto Ambientale", sub_style))
                 env_section.append(Spacer(1, 8))
                 
                 env_data = [
@@ -1812,18 +2469,7 @@ class ShellyEnergyReport:
                 ]
                 
                 env_table = Table(env_data, colWidths=[6*cm, 5*cm])
-                env_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('TOPPADDING', (0, 1), (-1, -1), 6),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-                ]))
+                env_table.setStyle(_ENV_TABLE_STYLE)
                 env_section.append(env_table)
                 story.append(KeepTogether(env_section))
                 story.append(Spacer(1, 10))
@@ -1831,7 +2477,7 @@ class ShellyEnergyReport:
             # Previsioni
             predictions = self._generate_predictions(device_data)
             if predictions:
-                story.append(Paragraph("Previsioni", self.pdf_generator.styles['SubTitle']))
+                story.append(Paragraph("Previsioni", sub_style))
                 pred_text = []
                 if 'avg_daily_last_7_days' in predictions:
                     pred_text.append(f"• Media ultimi 7 giorni: {predictions['avg_daily_last_7_days']:.2f} kWh/giorno")
@@ -1842,16 +2488,14 @@ class ShellyEnergyReport:
                     pred_text.append(f"• Trend: {trend['direction']} del {trend['percentage']:.1f}%")
                 
                 for text in pred_text:
-                    story.append(Paragraph(text, self.pdf_generator.styles['Normal']))
-                    story.append(Spacer(1, 3))
+                    story.extend((Paragraph(text, normal_style), Spacer(1, 3)))
                 story.append(Spacer(1, 10))
             
             # Qualità rete
-            from reportlab.platypus import KeepTogether
             quality = self._analyze_power_quality(device_data)
             if quality and 'voltage' in quality:
                 quality_section = []
-                quality_section.append(Paragraph("Qualità Rete", self.pdf_generator.styles['SubTitle']))
+                quality_section.append(Paragraph("Qualità Rete", sub_style))
                 quality_section.append(Spacer(1, 8))
                 
                 v = quality['voltage']
@@ -1863,18 +2507,7 @@ class ShellyEnergyReport:
                 ]
                 
                 quality_table = Table(quality_data, colWidths=[6*cm, 5*cm])
-                quality_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e67e22')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('TOPPADDING', (0, 1), (-1, -1), 6),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-                ]))
+                quality_table.setStyle(_QUALITY_TABLE_STYLE)
                 quality_section.append(quality_table)
                 story.append(KeepTogether(quality_section))
                 story.append(Spacer(1, 10))
@@ -1882,140 +2515,69 @@ class ShellyEnergyReport:
             story.append(PageBreak())
             
             # 3. GRAFICI
-            story.append(Paragraph("3. GRAFICI DI SINTESI", self.pdf_generator.styles['SectionTitle']))
+            story.append(Paragraph("3. GRAFICI DI SINTESI", section_style))
             story.append(Spacer(1, 15))
             
             for plot_path in plot_paths:
                 if plot_path.exists():
-                    img = Image(str(plot_path), width=15*cm, height=9*cm)
+                    img = _pdf_image(plot_path, 15*cm, 9*cm)
                     story.append(img)
                     story.append(Spacer(1, 10))
             
             # 4. RACCOMANDAZIONI E PIANO DI AZIONE
             story.append(PageBreak())
-            story.append(Paragraph("4. RACCOMANDAZIONI E PIANO DI AZIONE", self.pdf_generator.styles['SectionTitle']))
+            story.append(Paragraph("4. RACCOMANDAZIONI E PIANO DI AZIONE", section_style))
             story.append(Spacer(1, 15))
             
             # 4.1 Analisi dei Trend
-            story.append(Paragraph("4.1 Analisi dei Trend", self.pdf_generator.styles['SubTitle']))
+            story.append(Paragraph("4.1 Analisi dei Trend", sub_style))
             story.append(Spacer(1, 10))
             
-            trend_analysis = [
-                "• <b>Monitoraggio continuo</b>: Implementare sistema di monitoraggio in tempo reale",
-                "• <b>Identificazione pattern</b>: Analizzare ricorrenze settimanali e mensili",
-                "• <b>Ottimizzazione oraria</b>: Spostare carichi non critici nelle ore di minor costo",
-                "• <b>Gestione picchi</b>: Implementare strategie di load shedding",
-                "• <b>Manutenzione preventiva</b>: Monitorare efficienza degli impianti"
-            ]
-            
-            for item in trend_analysis:
-                story.append(Paragraph(item, self.pdf_generator.styles['Normal']))
-                story.append(Spacer(1, 4))
+            story.append(self.pdf_generator.static_list(_TREND_ITEMS, 'ListText'))
             
             story.append(Spacer(1, 20))
             
             # 4.2 Piano di Azione Raccomandato
-            story.append(Paragraph("4.2 Piano di Azione Raccomandato", self.pdf_generator.styles['SubTitle']))
+            story.append(Paragraph("4.2 Piano di Azione Raccomandato", sub_style))
             story.append(Spacer(1, 10))
             
-            action_plan = [
-                ["Fase", "Attività", "Timeline", "Responsabile"],
-                ["1", "Analisi approfondita carichi", "2 settimane", "Team Energia"],
-                ["2", "Identificazione ottimizzazioni", "1 settimana", "Team Energia"],
-                ["3", "Pianificazione interventi", "1 mese", "Management"],
-                ["4", "Implementazione", "2-3 mesi", "Team Tecnico"],
-                ["5", "Monitoraggio risultati", "Continuo", "Team Energia"]
-            ]
+            action_table = Table(_ACTION_PLAN_ROWS, colWidths=_ACTION_PLAN_COL_WIDTHS)
+            action_table.setStyle(_PLAN_TABLE_STYLE)
             
-            action_table = Table(action_plan, colWidths=[1.5*cm, 6*cm, 3*cm, 3*cm])
-            action_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')])
-            ]))
-            
-            story.append(KeepTogether([action_table]))
+            story.append(action_table)
             story.append(Spacer(1, 20))
             
             # 4.3 Stima Risparmi Potenziali
-            story.append(Paragraph("4.3 Stima Risparmi Potenziali", self.pdf_generator.styles['SubTitle']))
+            story.append(Paragraph("4.3 Stima Risparmi Potenziali", sub_style))
             story.append(Spacer(1, 10))
             
-            savings_items = [
-                "• <b>Riduzione picchi del 20%</b>: Risparmio sui costi di potenza contrattuale",
-                "• <b>Ottimizzazione oraria</b>: -10/15% su costo energia tramite tariffe biorarie",
-                "• <b>Miglioramento efficienza</b>: -5/10% su consumi base",
-                "• <b>ROI stimato</b>: 12-18 mesi per interventi di media entità",
-                "• <b>Risparmio annuo stimato</b>: 15-25% sulla bolletta energetica"
-            ]
-            
-            for item in savings_items:
-                story.append(Paragraph(
-                    item,
-                    ParagraphStyle(
-                        name='SavingsText',
-                        parent=self.pdf_generator.styles['Normal'],
-                        fontSize=10,
-                        textColor=colors.HexColor('#c0392b'),
-                        spaceAfter=5
-                    )
-                ))
+            story.append(self.pdf_generator.static_list(_SAVINGS_ITEMS, 'SavingsText'))
             
             story.append(Spacer(1, 20))
             
             # 5. APPENDICE TECNICA
             story.append(PageBreak())
-            story.append(Paragraph("5. APPENDICE TECNICA", self.pdf_generator.styles['SectionTitle']))
+            story.append(Paragraph("5. APPENDICE TECNICA", section_style))
             story.append(Spacer(1, 15))
             
             # Metodologia
-            story.append(Paragraph("<b>Metodologia di Analisi:</b>", self.pdf_generator.styles['SubTitle']))
+            story.append(Paragraph("<b>Metodologia di Analisi:</b>", sub_style))
             story.append(Spacer(1, 8))
-            methodology_items = [
-                "• Dati raccolti tramite Home Assistant History API",
-                "• Periodo di analisi: ultimi 7 giorni",
-                "• Frequenza campionamento: dati aggregati ogni ora",
-                "• Calcolo CO2: 0.233 kg per kWh (mix energetico nazionale)"
-            ]
-            for item in methodology_items:
-                story.append(Paragraph(item, self.pdf_generator.styles['Normal']))
-                story.append(Spacer(1, 4))
+            story.append(self.pdf_generator.static_list(_METHODOLOGY_ITEMS, 'ListText'))
             
             story.append(Spacer(1, 15))
             
             # Parametri
-            story.append(Paragraph("<b>Parametri di Riferimento:</b>", self.pdf_generator.styles['SubTitle']))
+            story.append(Paragraph("<b>Parametri di Riferimento:</b>", sub_style))
             story.append(Spacer(1, 8))
-            params_items = [
-                "• Tensione nominale: 220-240V",
-                "• Fascia notturna: 00:00-06:00",
-                "• Soglia consumo notturno anomalo: >30% del diurno"
-            ]
-            for item in params_items:
-                story.append(Paragraph(item, self.pdf_generator.styles['Normal']))
-                story.append(Spacer(1, 4))
+            story.append(self.pdf_generator.static_list(_PARAMS_ITEMS, 'ListText'))
             
             story.append(Spacer(1, 15))
             
             # Note
-            story.append(Paragraph("<b>Note Tecniche:</b>", self.pdf_generator.styles['SubTitle']))
+            story.append(Paragraph("<b>Note Tecniche:</b>", sub_style))
             story.append(Spacer(1, 8))
-            notes_items = [
-                "• I dati si riferiscono al dispositivo specifico",
-                "• Le previsioni sono basate su medie storiche a 7 giorni",
-                "• I risparmi stimati sono indicativi e dipendono dalle condizioni operative"
-            ]
-            for item in notes_items:
-                story.append(Paragraph(item, self.pdf_generator.styles['Normal']))
-                story.append(Spacer(1, 4))
+            story.append(self.pdf_generator.static_list(_NOTES_ITEMS, 'ListText'))
             
             doc.build(story)
             print(f"[INFO] PDF saved: {pdf_path.name}")
@@ -2053,9 +2615,10 @@ class ShellyEnergyReport:
         print(f"[INFO] Total devices in data: {len(unique_devices)}")
         
         # Filter by selected entities if available
-        if self.selected_entities:
-            print(f"[INFO] Filtering by {len(self.selected_entities)} selected entities")
-            unique_devices = [d for d in unique_devices if d in self.selected_entities]
+        selected = self.selected_entities  # frozenset from _load_selected_entities, or None
+        if selected:
+            print(f"[INFO] Filtering by {len(selected)} selected entities")
+            unique_devices = [d for d in unique_devices if d in selected]
             print(f"[INFO] Devices to process after filtering: {len(unique_devices)}")
             
             if len(unique_devices) == 0:
@@ -2067,34 +2630,57 @@ class ShellyEnergyReport:
         else:
             print(f"[INFO] No selection filter - processing all {len(unique_devices)} devices")
         
-        for device_id in unique_devices:
-            device_data = self.all_data[self.all_data['entity_id'] == device_id].copy()
+        # One hashed partition instead of a full entity_id scan + copy per device
+        device_rows = self.all_data[self.all_data['entity_id'].isin(selected)] if selected else self.all_data
+        by_device = device_rows.groupby('entity_id', sort=False, observed=True)
+        
+        # Statistiche di tutti i dispositivi in un solo passaggio: (colonna, funzione) per riga
+        stat_cols = [c for c in _DEVICE_STAT_COLUMNS if c in device_rows.columns]
+        device_stats = by_device[stat_cols].agg(_DEVICE_STAT_FUNCS) if stat_cols else None
+        
+        devices = []
+        for device_id, device_data in by_device:
             friendly_name = device_data['friendly_name'].iloc[0] if 'friendly_name' in device_data.columns and len(device_data) > 0 else device_id
             
-            print(f"[INFO] Analyzing device: {friendly_name}")
-            print(f"  - Entity ID: {device_id}")
-            print(f"  - Data: {len(device_data)} rows")
-            
-            # Create device-specific report
-            self._create_device_report(device_id, friendly_name, device_data)
+            print(
+                f"[INFO] Analyzing device: {friendly_name}\n"
+                f"  - Entity ID: {device_id}\n"
+                f"  - Data: {len(device_data)} rows"
+            )
+            stats = device_stats.loc[device_id].unstack(0) if device_stats is not None else None
+            devices.append((device_id, friendly_name, device_data, stats))
+        
+        # Create device-specific reports
+        self._create_device_reports(devices)
         
         print(f"[INFO] Analysis completed for {len(unique_devices)} devices")
         
-        # Final summary
-        print("=" * 60)
-        print("ANALYSIS COMPLETED SUCCESSFULLY")
-        print("=" * 60)
-        print("GENERATED OUTPUT SUMMARY:")
-        print(f"  - CSV files processed: {len(self.data_files)}")
-        print(f"  - Reports generated: {len(unique_devices)}")
+        # Final summary, written in one call so worker output cannot interleave with it
+        summary = [
+            "=" * 60,
+            "ANALYSIS COMPLETED SUCCESSFULLY",
+            "=" * 60,
+            "GENERATED OUTPUT SUMMARY:",
+            f"  - CSV files processed: {len(self.data_files)}",
+            f"  - Reports generated: {len(unique_devices)}",
+        ]
         if self.selected_entities:
-            print(f"  - Selected entities: {len(self.selected_entities)}")
-        print(f"  - Total data analyzed: {len(self.all_data):,} rows")
-        print("MAIN PATHS:")
-        print(f"  - Daily reports: {self.daily_reports_dir}")
-        print(f"  - General report: {self.general_report_dir}")
-        print(f"  - Output files: {self.general_report_dir}")
-        print("=" * 60)
+            summary.append(f"  - Selected entities: {len(self.selected_entities)}")
+        summary += [
+            f"  - Total data analyzed: {len(self.all_data):,} rows",
+            "MAIN PATHS:",
+            f"  - Daily reports: {self.daily_reports_dir}",
+            f"  - General report: {self.general_report_dir}",
+            f"  - Output files: {self.general_report_dir}",
+            "=" * 60,
+        ]
+        print("\n".join(summary))
+
+
+def _build_device_report(analyzer: ShellyEnergyReport, device_id: str, friendly_name: str,
+                         device_data: pd.DataFrame, stats: pd.DataFrame = None):
+    """Render a single device report (runs in a worker process)."""
+    analyzer._create_device_report(device_id, friendly_name, device_data, stats)
 
 
 def main():